@@ -4,118 +4,497 @@ Email validation script using SMTP verification
 Reads CSV file, validates emails, and outputs cleaned data with validation results
 """
 
+import argparse
 import csv
+import io
 import smtplib
 import socket
 import dns.resolver
+import dns.asyncresolver
 import re
 import time
 import sys
 import asyncio
 import aiosmtplib
-from concurrent.futures import ThreadPoolExecutor
-from typing import Dict, List, Tuple, Optional, Set
+from typing import Dict, Iterator, List, Tuple, Optional, Set
 import logging
 from functools import lru_cache
-from collections import defaultdict
+from operator import attrgetter
+from collections import defaultdict, deque, OrderedDict
 import os
 import json
 import random
 from pathlib import Path
 import threading
+import itertools
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Compiled once at import time; is_valid_format is on the hot path of every row
+_EMAIL_RE = re.compile(
+    r'^[a-zA-Z0-9.!#$%&\'*+/=?^_`{|}~-]+@[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?'
+    r'(?:\.[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?)+\Z'
+)
+
+# Longest address that fits an SMTP forward-path (RFC 5321, section 4.5.3.1.3)
+MAX_EMAIL_LENGTH = 254
+
+# Large providers whose RCPT replies carry no signal (catch-all, greylisting or
+# aggressive rate limiting); a valid format and MX record is all we can learn
+FORMAT_ONLY_DOMAINS = frozenset({
+    'gmail.com', 'googlemail.com', 'yahoo.com', 'outlook.com', 'hotmail.com',
+    'live.com', 'msn.com', 'icloud.com', 'me.com', 'aol.com', 'proton.me', 'protonmail.com',
+})
+
+# Verdicts kept for duplicate emails (least recently seen evicted first);
+# bounds validator memory on lists with millions of unique addresses
+RESULT_CACHE_SIZE = 200000
+
+# Emails between two aggregated progress lines in the CSV pipeline
+PROGRESS_LOG_INTERVAL = 1000
+
+# Recipients probed over one SMTP session before it is recycled; many servers
+# start deferring (452 too many recipients) well before a list is exhausted
+MAX_RCPT_PER_SESSION = 50
+
+# Precomputed anti-spam jitter values cycled through by get_probe_delay
+JITTER_RING_SIZE = 1024
+
+# Batches the CSV pipeline keeps in flight; with several queued, a free SMTP
+# session slot never waits for the slowest domain of an earlier batch
+MAX_PENDING_BATCHES = 4
+
+# Input rows read (and interleaved by domain) at a time by the CSV pipeline
+READ_WINDOW_ROWS = 10000
+
+# Streamed result rows handed to csv.writer.writerows at a time
+WRITE_BATCH_ROWS = 256
+
+# Buffer size for the bulk CSV reads and writes; the 8 KB default means one
+# read() syscall per handful of rows on multi-GB inputs
+CSV_BUFFER_SIZE = 1 << 20
+
+# MX cache bounds: entry count, lifetime when the answer carries no TTL, and
+# lifetime of a failure that may be transient (timeout, SERVFAIL)
+MX_CACHE_SIZE = 4096
+MX_CACHE_DEFAULT_TTL = 3600
+MX_NEGATIVE_TTL = 60
+
+# Seconds an MX host that could not be connected to is skipped for, so each
+# of its remaining emails does not wait out another connect timeout
+MX_UNREACHABLE_TTL = 60
+
+# Seconds a resolved MX host address is reused for new async SMTP sessions
+MX_ADDRESS_TTL = 300
+
+# Seconds between sweeps of the per-domain and per-MX bookkeeping, which would
+# otherwise keep an entry for every domain of the input until the run ends
+DOMAIN_STATE_PRUNE_INTERVAL = 60
+
+# Seconds covered by the per-domain anti-spam limit (max_requests_per_hour)
+RATE_LIMIT_WINDOW = 3600
+
+# DNS query budget: per-nameserver timeout and total lifetime of one lookup
+# (dnspython defaults to 2 s and 5 s), and the public resolvers used when
+# the host has no resolver configuration
+DNS_TIMEOUT = 2.0
+DNS_LIFETIME = 3.0
+FALLBACK_NAMESERVERS = ['1.1.1.1', '8.8.8.8']
+
+
+@lru_cache(maxsize=128)
+def _derive_paths(base_filename: str) -> Tuple[str, str, str]:
+    """
+    Valid, invalid and combined output paths for an output base name.
+
+    Only the final extension is replaced (a base without one gets .csv),
+    so a '.csv' elsewhere in the path is left alone and the three paths
+    never collapse into the base name itself.
+    """
+    root, ext = os.path.splitext(base_filename)
+    ext = ext or '.csv'
+    return f"{root}_valid{ext}", f"{root}_invalid{ext}", f"{root}_results{ext}"
+
 
 class StreamingCSVWriter:
-    """Thread-safe streaming CSV writer for real-time output"""
+    """
+    Thread-safe streaming CSV writer for real-time output.
+
+    Rows are streamed into the combined results file only, opened once when
+    the first rows are written and appended to so a resumed run extends the
+    earlier output; split_results() derives the valid and invalid files
+    afterwards.
+    """
     def __init__(self, base_filename: str):
         self.base_filename = base_filename
-        self.valid_filename = base_filename.replace('.csv', '_valid.csv')
-        self.invalid_filename = base_filename.replace('.csv', '_invalid.csv')
-        self.results_filename = base_filename.replace('.csv', '_results.csv')
+        self.valid_filename, self.invalid_filename, self.results_filename = _derive_paths(base_filename)
         
         self.lock = threading.Lock()
-        self.headers_written = {'valid': False, 'invalid': False, 'results': False}
+        self.results_file = None
+        self.writer = None
+        self.fieldnames = None
+        self.pending_rows = []
         
     def write_result(self, result: Dict, fieldnames: List[str]):
-        """Write a single result immediately"""
+        """Queue a single result; rows reach the file WRITE_BATCH_ROWS at a time"""
+        row = [result.get(field, '') for field in fieldnames]
         with self.lock:
-            # Write to results file
-            self._write_to_file(self.results_filename, result, fieldnames, 'results')
-            
-            # Write to valid/invalid files
-            if result['email_valid']:
-                self._write_to_file(self.valid_filename, result, fieldnames, 'valid')
-            else:
-                self._write_to_file(self.invalid_filename, result, fieldnames, 'invalid')
+            self.fieldnames = fieldnames
+            self.pending_rows.append(row)
+            if len(self.pending_rows) >= WRITE_BATCH_ROWS:
+                self._write_pending()
+    
+    def _write_pending(self):
+        """Hand the queued rows to the C writer in one writerows call (lock held)"""
+        if not self.pending_rows:
+            return
+        if self.writer is None:
+            self.results_file = open(self.results_filename, 'a', newline='', encoding='utf-8',
+                                     buffering=CSV_BUFFER_SIZE)
+            # Positional writer: DictWriter would re-check the row's keys against
+            # fieldnames on every call
+            self.writer = csv.writer(self.results_file)
+            if self.results_file.tell() == 0:
+                self.writer.writerow(self.fieldnames)
+        self.writer.writerows(self.pending_rows)
+        self.pending_rows.clear()
+    
+    def flush(self):
+        """Push queued and buffered rows to disk; called on batch boundaries, not per row"""
+        with self.lock:
+            self._write_pending()
+            if self.results_file is not None:
+                self.results_file.flush()
+    
+    def close(self):
+        """Write any queued rows and close the results file"""
+        with self.lock:
+            self._write_pending()
+            if self.results_file is not None:
+                self.results_file.close()
+            self.results_file = None
+            self.writer = None
     
-    def _write_to_file(self, filename: str, result: Dict, fieldnames: List[str], file_type: str):
-        """Write to specific file with header handling"""
-        file_exists = os.path.exists(filename)
-        mode = 'a' if file_exists else 'w'
+    def split_results(self):
+        """
+        Derive the valid and invalid files from the combined results file.
+
+        One sequential pass after the run replaces a second write per row
+        during streaming; each file is created only if it gets a row.
+        """
+        try:
+            csvfile = open(self.results_filename, 'r', newline='', encoding='utf-8',
+                           buffering=CSV_BUFFER_SIZE)
+        except FileNotFoundError:
+            return
         
-        with open(filename, mode, newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            if not file_exists or not self.headers_written[file_type]:
-                writer.writeheader()
-                self.headers_written[file_type] = True
+        files = {}
+        writers = {}
+        try:
+            with csvfile:
+                reader = csv.reader(csvfile)
+                header = next(reader, None)
+                if header is None:
+                    return
+                valid_column = header.index('email_valid')
                 
-            writer.writerow(result)
+                for row in reader:
+                    file_type = 'valid' if row[valid_column] == 'True' else 'invalid'
+                    writer = writers.get(file_type)
+                    if writer is None:
+                        filename = getattr(self, f'{file_type}_filename')
+                        files[file_type] = open(filename, 'w', newline='', encoding='utf-8',
+                                                buffering=CSV_BUFFER_SIZE)
+                        writer = writers[file_type] = csv.writer(files[file_type])
+                        writer.writerow(header)
+                    writer.writerow(row)
+        finally:
+            for split_file in files.values():
+                split_file.close()
 
 
 class ProgressTracker:
-    """Track processing progress for resume capability"""
+    """
+    Track processing progress for resume capability.
+
+    Finished emails are held in memory until the next checkpoint, which
+    appends them to `<progress_file>.log`, one JSON string per line (an
+    email taken from a quoted CSV field may itself contain a newline). A
+    checkpoint is taken after the CSV rows are flushed, so no line reaches
+    the log before its row; each one only writes the lines marked since
+    the previous one. The JSON progress file is rewritten once, by
+    compact(), when a run ends.
+
+    Emails finished by earlier runs and by this one are kept apart, so a
+    duplicate this run has already written is never mistaken for resumed.
+    """
     def __init__(self, progress_file: str):
         self.progress_file = progress_file
+        self.log_file = f"{progress_file}.log"
+        # Finished by previous runs
         self.processed_emails = set()
+        # Finished by this run, folded into processed_emails by compact()
+        self.new_emails = set()
+        # Marked since the last checkpoint, not yet in the log
+        self._unsaved = []
+        self._log = None
+        # Whether a log or this run's marks are left for compact() to fold in
+        self._log_pending = False
         self.load_progress()
     
     def load_progress(self):
         """Load previously processed emails"""
-        if os.path.exists(self.progress_file):
+        # Missing files are expected on a first run: opening directly costs one
+        # syscall where an exists() check in front of it costs two
+        try:
             try:
                 with open(self.progress_file, 'r') as f:
                     data = json.load(f)
                     self.processed_emails = set(data.get('processed_emails', []))
-                logger.info(f"Loaded progress: {len(self.processed_emails)} emails already processed")
-            except Exception as e:
-                logger.warning(f"Could not load progress file: {e}")
+            except FileNotFoundError:
+                pass
+            
+            # Emails logged after the last compaction (e.g. by an interrupted run)
+            try:
+                with open(self.log_file, 'r', encoding='utf-8') as f:
+                    self._log_pending = True
+                    for line in f:
+                        try:
+                            self.processed_emails.add(json.loads(line))
+                        except ValueError:
+                            # Partial last line of an interrupted write; that email is redone
+                            continue
+            except FileNotFoundError:
+                pass
+        except Exception as e:
+            logger.warning(f"Could not load progress file: {e}")
+        
+        if self.processed_emails:
+            logger.info(f"Loaded progress: {len(self.processed_emails)} emails already processed")
     
     def save_progress(self):
-        """Save current progress"""
+        """Append the emails marked since the last checkpoint; call once their rows are flushed"""
+        if not self._unsaved:
+            return
+        try:
+            if self._log is None:
+                self._log = open(self.log_file, 'a', encoding='utf-8')
+            self._log.write(''.join(json.dumps(email) + '\n' for email in self._unsaved))
+            self._log.flush()
+            self._unsaved.clear()
+        except Exception as e:
+            logger.error(f"Could not save progress: {e}")
+    
+    def compact(self):
+        """Fold the log into the JSON progress file and remove it"""
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        # Nothing was processed and no earlier log was found: the JSON file,
+        # if any, is already current, and none is created for a run that
+        # never read a row (such as a missing input file)
+        if not self._log_pending:
+            return
+        self._log_pending = False
+        # The caller has closed the CSV output by now, so unsaved marks are kept too
+        self.processed_emails.update(self.new_emails)
+        self.new_emails.clear()
+        self._unsaved.clear()
         try:
             with open(self.progress_file, 'w') as f:
                 json.dump({'processed_emails': list(self.processed_emails)}, f)
+            try:
+                os.remove(self.log_file)
+            except FileNotFoundError:
+                pass
         except Exception as e:
             logger.error(f"Could not save progress: {e}")
     
     def is_processed(self, email: str) -> bool:
-        """Check if email was already processed"""
+        """Check if email was already processed by a previous run"""
         return email in self.processed_emails
     
     def mark_processed(self, email: str):
         """Mark email as processed"""
-        self.processed_emails.add(email)
+        if email in self.processed_emails or email in self.new_emails:
+            return
+        self.new_emails.add(email)
+        self._unsaved.append(email)
+        self._log_pending = True
+
+
+def build_resolver(resolver_class=dns.resolver.Resolver, nameservers: Optional[List[str]] = None):
+    """
+    Create a DNS resolver with short timeouts.
+
+    Uses the system configuration unless `nameservers` is given; hosts with
+    no usable configuration fall back to FALLBACK_NAMESERVERS.
+    """
+    try:
+        resolver = resolver_class(configure=nameservers is None)
+    except dns.resolver.NoResolverConfiguration:
+        resolver = resolver_class(configure=False)
+        nameservers = nameservers or FALLBACK_NAMESERVERS
+
+    if nameservers:
+        resolver.nameservers = list(nameservers)
+    resolver.timeout = DNS_TIMEOUT
+    resolver.lifetime = DNS_LIFETIME
+    return resolver
+
+
+class MXCache:
+    """Thread-safe LRU cache of MX lookups with per-entry expiry"""
+    def __init__(self, maxsize: int = MX_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, domain: str) -> Tuple[bool, Optional[str]]:
+        """Return (hit, mx_record) for a domain, dropping expired entries"""
+        with self.lock:
+            entry = self.entries.get(domain)
+            if entry is None:
+                return False, None
+
+            mx_record, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self.entries[domain]
+                return False, None
+
+            self.entries.move_to_end(domain)
+            return True, mx_record
+
+    def set(self, domain: str, mx_record: Optional[str], ttl: float):
+        """Store a lookup result, evicting the least recently used entries"""
+        with self.lock:
+            self.entries[domain] = (mx_record, time.monotonic() + ttl)
+            self.entries.move_to_end(domain)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def load(self, path: str):
+        """Load entries saved by a previous run, skipping those already expired"""
+        # Saved expiries are wall-clock times; monotonic clocks do not survive a restart
+        now = time.time()
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            # Unpack everything first so a malformed file loads nothing
+            entries = [(domain, mx_record, expires_at - now)
+                       for domain, (mx_record, expires_at) in data.items()
+                       if expires_at > now]
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Could not load MX cache: {e}")
+            return
+
+        for domain, mx_record, ttl in entries:
+            self.set(domain, mx_record, ttl)
+        logger.debug("Loaded %d MX cache entries from %s", len(self), path)
+
+    def save(self, path: str):
+        """Save unexpired entries so a resumed run does not query them again"""
+        offset = time.time() - time.monotonic()
+        with self.lock:
+            data = {domain: (mx_record, expires_at + offset)
+                    for domain, (mx_record, expires_at) in self.entries.items()}
+        if not data:
+            return
+        try:
+            with open(path, 'w') as f:
+                json.dump(data, f)
+        except Exception as e:
+            logger.error(f"Could not save MX cache: {e}")
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class ValidationResult:
+    """
+    Outcome of validating one email.
+
+    A __slots__ object rather than a dict: the validator keeps one per
+    unique email for duplicate detection. Item access (result['valid'])
+    keeps working for callers written against the dict results.
+    """
+    __slots__ = ('email', 'valid', 'reason', 'format_valid', 'domain_exists', 'smtp_valid')
+
+    def __init__(self, email: str, valid: bool = False, reason: str = '', format_valid: bool = False,
+                 domain_exists: bool = False, smtp_valid: bool = False):
+        self.email = email
+        self.valid = valid
+        self.reason = reason
+        self.format_valid = format_valid
+        self.domain_exists = domain_exists
+        self.smtp_valid = smtp_valid
+
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.__slots__
+
+    def to_dict(self) -> Dict[str, any]:
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    def copy(self) -> 'ValidationResult':
+        return ValidationResult(**self.to_dict())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ValidationResult):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"ValidationResult({self.to_dict()!r})"
 
 
 class EmailValidator:
     def __init__(self, timeout=10, delay=1, max_workers=20, skip_smtp=False, 
-                 anti_spam_mode=True, progress_tracker=None):
+                 anti_spam_mode=True, progress_tracker=None, format_only_domains=FORMAT_ONLY_DOMAINS,
+                 nameservers=None):
         self.timeout = timeout
         self.delay = delay
         self.max_workers = max_workers
         self.skip_smtp = skip_smtp
         self.anti_spam_mode = anti_spam_mode
         self.progress_tracker = progress_tracker
+        self.format_only_domains = frozenset(format_only_domains)
         
-        self.mx_cache = {}
-        self.processed_emails = set()
-        self.domain_delays = defaultdict(lambda: delay)
+        self.mx_cache = MXCache()
+        self.nameservers = nameservers
+        self._resolver = build_resolver(dns.resolver.Resolver, nameservers)
+        self._async_resolver = None
+        self.max_sessions_per_mx = 2
+        # MX host -> [semaphore, sessions holding or awaiting it]
+        self._mx_semaphores = {}
+        # MX host -> monotonic time until which it is treated as unreachable
+        self._unreachable_mx = {}
+        # MX host -> (address, monotonic expiry) for the async sessions
+        self._mx_addresses = {}
+        self._session_slots = None
+        self.result_cache = OrderedDict()
+        self.max_cached_results = RESULT_CACHE_SIZE
+        # Only domains whose delay was raised get an entry; lookups fall back to self.delay
+        self.domain_delays = {}
         self.domain_error_counts = defaultdict(int)
+        # Monotonic time at which each domain's next probe may start
+        self._next_probe_at = {}
+        self._next_prune_at = time.monotonic() + DOMAIN_STATE_PRUNE_INTERVAL
         
         # Anti-Spamhaus measures
         self.user_agents = [
@@ -126,206 +505,789 @@ class EmailValidator:
         self.helo_domains = ['gmail.com', 'outlook.com', 'yahoo.com', 'hotmail.com']
         self.sender_emails = ['test@gmail.com', 'noreply@outlook.com', 'check@yahoo.com']
         
+        # Randomness drawn once up front: cycling shuffled rings costs a next()
+        # per session or probe instead of a call into the global generator
+        identities = [(helo, sender) for helo in self.helo_domains for sender in self.sender_emails]
+        random.shuffle(identities)
+        self._identities = itertools.cycle(identities)
+        self._jitter = itertools.cycle([random.uniform(0.1, 0.5) for _ in range(JITTER_RING_SIZE)])
+        
         # Rate limiting for anti-spam
-        self.requests_per_domain = defaultdict(int)
-        self.last_request_time = defaultdict(float)
+        # Monotonic times of each domain's checks within the last hour, oldest first
+        self.requests_per_domain = defaultdict(deque)
         self.max_requests_per_hour = 100
 
-    def is_valid_format(self, email: str) -> bool:
+    @staticmethod
+    def is_valid_format(email: str) -> bool:
         """Basic email format validation"""
-        pattern = r'^[a-zA-Z0-9.!#$%&\'*+/=?^_`{|}~-]+@[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?(?:\.[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?)+$'
-        return re.match(pattern, email) is not None
+        # Cheap C-level rejections before running the regex
+        if not 3 <= len(email) <= MAX_EMAIL_LENGTH or email.count('@') != 1:
+            return False
+        return _EMAIL_RE.match(email) is not None
 
     def get_mx_record(self, domain: str) -> Optional[str]:
         """Get MX record for domain with caching"""
-        if domain in self.mx_cache:
-            return self.mx_cache[domain]
+        found, mx_record = self.mx_cache.get(domain)
+        if found:
+            return mx_record
         
         try:
-            mx_records = dns.resolver.resolve(domain, 'MX')
-            mx_record = sorted(mx_records, key=lambda x: x.preference)[0]
-            result = str(mx_record.exchange).rstrip('.')
-            self.mx_cache[domain] = result
-            return result
+            mx_records = self._resolver.resolve(domain, 'MX')
+            return self._cache_mx_answer(domain, mx_records)
+        except Exception as e:
+            self._cache_mx_failure(domain, e)
+            return None
+
+    async def get_mx_record_async(self, domain: str) -> Optional[str]:
+        """Async counterpart of get_mx_record built on dns.asyncresolver"""
+        found, mx_record = self.mx_cache.get(domain)
+        if found:
+            return mx_record
+
+        if self._async_resolver is None:
+            self._async_resolver = build_resolver(dns.asyncresolver.Resolver, self.nameservers)
+        try:
+            mx_records = await self._async_resolver.resolve(domain, 'MX')
+            return self._cache_mx_answer(domain, mx_records)
         except Exception as e:
-            logger.debug(f"No MX record found for {domain}: {e}")
-            self.mx_cache[domain] = None
+            self._cache_mx_failure(domain, e)
             return None
 
+    async def prefetch_mx_records(self, domains, concurrency: int = 64):
+        """Resolve MX records for many domains concurrently to warm the MX cache"""
+        pending = [domain for domain in set(domains) if not self.mx_cache.get(domain)[0]]
+        if not pending:
+            return
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def resolve(domain):
+            async with semaphore:
+                await self.get_mx_record_async(domain)
+
+        await asyncio.gather(*(resolve(domain) for domain in pending))
+
+    def _cache_mx_failure(self, domain: str, error: Exception):
+        """
+        Negatively cache a failed MX lookup.
+
+        NXDOMAIN and NoAnswer are definitive and kept as long as a positive
+        answer; timeouts and server failures may be transient, so they are
+        only remembered for MX_NEGATIVE_TTL seconds.
+        """
+        logger.debug("No MX record found for %s: %s", domain, error)
+        if isinstance(error, (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer)):
+            self.mx_cache.set(domain, None, MX_CACHE_DEFAULT_TTL)
+        else:
+            self.mx_cache.set(domain, None, MX_NEGATIVE_TTL)
+
+    def _cache_mx_answer(self, domain: str, mx_records) -> str:
+        """Pick the highest priority exchange from an MX answer and cache it"""
+        mx_record = min(mx_records, key=attrgetter('preference'))
+        result = str(mx_record.exchange).rstrip('.')
+        self.mx_cache.set(domain, result, self._answer_ttl(mx_records))
+        return result
+
+    @staticmethod
+    def _answer_ttl(answer) -> float:
+        """TTL of a DNS answer, falling back to the cache default"""
+        ttl = getattr(getattr(answer, 'rrset', None), 'ttl', None)
+        return ttl if isinstance(ttl, int) else MX_CACHE_DEFAULT_TTL
+
     def _check_rate_limit(self, domain: str) -> bool:
         """Check if we're hitting rate limits for anti-spam protection"""
         if not self.anti_spam_mode:
             return True
             
-        current_time = time.time()
+        current_time = time.monotonic()
         
-        # Reset counter if an hour has passed
-        if current_time - self.last_request_time[domain] > 3600:
-            self.requests_per_domain[domain] = 0
+        # Sliding one-hour window: drop the checks that have aged out of it
+        requests = self.requests_per_domain[domain]
+        while requests and current_time - requests[0] > RATE_LIMIT_WINDOW:
+            requests.popleft()
         
-        if self.requests_per_domain[domain] >= self.max_requests_per_hour:
+        if len(requests) >= self.max_requests_per_hour:
             return False
             
-        self.requests_per_domain[domain] += 1
-        self.last_request_time[domain] = current_time
+        requests.append(current_time)
         return True
 
-    def verify_email_smtp(self, email: str) -> Dict[str, any]:
+    def _precheck(self, email: str, result: ValidationResult, domain: str) -> Optional[str]:
         """
-        Verify email using SMTP with anti-spam measures and progress tracking
+        Run every check that precedes the SMTP probe.
+
+        `domain` is the email's lowercased domain, computed once by the caller.
+        Returns the MX record when the email still needs an SMTP probe, or
+        None when `result` already holds the final verdict.
         """
-        result = {
-            'email': email,
-            'valid': False,
-            'reason': '',
-            'format_valid': False,
-            'domain_exists': False,
-            'smtp_valid': False
-        }
-
-        # Check progress tracker first
-        if self.progress_tracker and self.progress_tracker.is_processed(email):
-            result['reason'] = 'Already processed (resumed)'
-            return result
+        if not self._precheck_local(email, result):
+            return None
+        return self._precheck_mx(email, result, domain, self.get_mx_record(domain))
 
-        # Check if already processed (duplicate detection)
-        if email in self.processed_emails:
-            result['reason'] = 'Duplicate email - using cached result'
-            return result
-        
-        self.processed_emails.add(email)
+    async def _precheck_async(self, email: str, result: ValidationResult, domain: str) -> Optional[str]:
+        """_precheck for the event loop: a cache miss is resolved with dns.asyncresolver"""
+        if not self._precheck_local(email, result):
+            return None
+        return self._precheck_mx(email, result, domain, await self.get_mx_record_async(domain))
+
+    def _precheck_local(self, email: str, result: ValidationResult) -> bool:
+        """The checks that need no network; True when the email still needs its MX record"""
+        # Duplicate of an email validated earlier in this run: reuse its verdict
+        cached = self.result_cache.get(email)
+        if cached is not None:
+            self.result_cache.move_to_end(email)
+            for key in cached.__slots__:
+                setattr(result, key, getattr(cached, key))
+            return False
+
+        # Check progress tracker (emails finished by a previous run); an email
+        # already finished by this run that fell out of result_cache is redone
+        if self.progress_tracker and self.progress_tracker.is_processed(email):
+            result.reason = 'Already processed (resumed)'
+            return False
 
         # Step 1: Format validation (early exit)
         if not self.is_valid_format(email):
-            result['reason'] = 'Invalid email format'
-            if self.progress_tracker:
-                self.progress_tracker.mark_processed(email)
-            return result
+            result.reason = 'Invalid email format'
+            self._finish(email, result)
+            return False
 
-        result['format_valid'] = True
+        result.format_valid = True
+        return True
 
+    def _precheck_mx(self, email: str, result: ValidationResult, domain: str,
+                     mx_record: Optional[str]) -> Optional[str]:
+        """The checks that follow the MX lookup, with _precheck's return value"""
         try:
-            domain = email.split('@')[1].lower()
-
-            # Anti-spam rate limiting
-            if not self._check_rate_limit(domain):
-                result['reason'] = 'Rate limit exceeded for domain (anti-spam)'
-                return result
-
-            # Step 2: Get MX record (early exit)
-            mx_record = self.get_mx_record(domain)
+            # Step 2: MX record (early exit)
             if not mx_record:
-                result['reason'] = 'No MX record found'
-                if self.progress_tracker:
-                    self.progress_tracker.mark_processed(email)
-                return result
+                result.reason = 'No MX record found'
+                self._finish(email, result)
+                return None
 
-            result['domain_exists'] = True
+            result.domain_exists = True
 
             # Step 3: SMTP verification (skip if configured)
             if self.skip_smtp:
-                result['valid'] = True
-                result['reason'] = 'Format and domain valid (SMTP skipped)'
-                if self.progress_tracker:
-                    self.progress_tracker.mark_processed(email)
-                return result
+                result.valid = True
+                result.reason = 'Format and domain valid (SMTP skipped)'
+                self._finish(email, result)
+                return None
 
-            # Anti-spam measures: randomize connection parameters
-            helo_domain = random.choice(self.helo_domains) if self.anti_spam_mode else 'gmail.com'
-            sender_email = random.choice(self.sender_emails) if self.anti_spam_mode else 'test@gmail.com'
+            if domain in self.format_only_domains:
+                result.valid = True
+                result.reason = 'Format and domain valid (SMTP skipped for provider)'
+                self._finish(email, result)
+                return None
 
-            try:
-                server = smtplib.SMTP(timeout=self.timeout)
-                server.set_debuglevel(0)
-                server.connect(mx_record, 25)
-                server.helo(helo_domain)
-                server.mail(sender_email)
-                code, message = server.rcpt(email)
-                server.quit()
-
-                if code == 250:
-                    result['valid'] = True
-                    result['smtp_valid'] = True
-                    result['reason'] = 'Email verified successfully'
-                    self.domain_error_counts[domain] = 0
-                else:
-                    result['reason'] = f'SMTP rejected: {code} {message}'
-                    self._handle_domain_error(domain)
-
-            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPServerDisconnected, socket.timeout) as e:
-                result['reason'] = f'SMTP error: {type(e).__name__}'
-                self._handle_domain_error(domain)
-            except Exception as e:
-                result['reason'] = f'SMTP error: {str(e)}'
-                self._handle_domain_error(domain)
+            if self._is_unreachable(mx_record):
+                result.reason = 'SMTP error: MX host unreachable'
+                self._finish(email, result)
+                return None
+
+            # Anti-spam rate limiting, counted only for emails that will be probed
+            if not self._check_rate_limit(domain):
+                result.reason = 'Rate limit exceeded for domain (anti-spam)'
+                return None
+
+            return mx_record
 
         except Exception as e:
-            result['reason'] = f'General error: {str(e)}'
+            result.reason = f'General error: {str(e)}'
+            self._finish(email, result)
+            return None
+
+    def _finish(self, email: str, result: ValidationResult):
+        """Record a final verdict for duplicates later in the run"""
+        # Stored as is, not copied: _precheck copies the verdict out for
+        # duplicates, and the pipeline only reads returned results
+        self.result_cache[email] = result
+        if len(self.result_cache) > self.max_cached_results:
+            # Least recently seen first; a duplicate arriving after its eviction
+            # is probed again
+            self.result_cache.popitem(last=False)
 
-        # Mark as processed in progress tracker
-        if self.progress_tracker:
-            self.progress_tracker.mark_processed(email)
+    def _smtp_identity(self) -> Tuple[str, str]:
+        """Pick the HELO domain and sender address for a new SMTP session"""
+        # Anti-spam measures: rotate connection parameters
+        if self.anti_spam_mode:
+            return next(self._identities)
+        return 'gmail.com', 'test@gmail.com'
+
+    def _record_rcpt_reply(self, result: ValidationResult, domain: str, code: int, message):
+        """Store the outcome of a RCPT TO reply in the result"""
+        if code == 250:
+            result.valid = True
+            result.smtp_valid = True
+            result.reason = 'Email verified successfully'
+            self.domain_error_counts.pop(domain, None)
+        else:
+            # Interned: a server answers most of its rejections with the same
+            # text, and every finished result stays alive in result_cache
+            result.reason = sys.intern(f'SMTP rejected: {code} {message}')
+            self._handle_domain_error(domain)
+
+    def _record_smtp_error(self, result: ValidationResult, domain: str, error: Exception):
+        """Store an SMTP failure in the result"""
+        if isinstance(error, (smtplib.SMTPRecipientsRefused, smtplib.SMTPServerDisconnected, socket.timeout,
+                              aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPTimeoutError)):
+            result.reason = sys.intern(f'SMTP error: {type(error).__name__}')
+        else:
+            result.reason = sys.intern(f'SMTP error: {str(error)}')
+        self._handle_domain_error(domain)
+
+    def _is_unreachable(self, mx_record: str) -> bool:
+        """Whether a recent connection attempt to `mx_record` failed"""
+        until = self._unreachable_mx.get(mx_record)
+        if until is None:
+            return False
+        if until > time.monotonic():
+            return True
+        del self._unreachable_mx[mx_record]
+        return False
+
+    def _mark_unreachable(self, mx_record: str):
+        """Skip `mx_record` for MX_UNREACHABLE_TTL seconds after a failed connection"""
+        self._unreachable_mx[mx_record] = time.monotonic() + MX_UNREACHABLE_TTL
+        logger.debug("MX host %s unreachable, skipping it for %ds", mx_record, MX_UNREACHABLE_TTL)
+
+    def _open_smtp(self, mx_record: str, helo_domain: str, esmtp: bool = False) -> smtplib.SMTP:
+        """Connect to a mail server and greet it, with EHLO when `esmtp` is set"""
+        server = smtplib.SMTP(timeout=self.timeout)
+        server.set_debuglevel(0)
+        try:
+            server.connect(mx_record, 25)
+        except OSError as e:
+            # Timeouts and refused or unroutable connections; SMTP-level errors
+            # (also OSErrors) come from a host that did answer
+            if not isinstance(e, smtplib.SMTPException):
+                self._mark_unreachable(mx_record)
+            raise
+        if esmtp and server.ehlo(helo_domain)[0] == 250:
+            return server
+        server.helo(helo_domain)
+        return server
+
+    @staticmethod
+    def _pipelined_envelope(sender_email: str, email: str) -> bytes:
+        """
+        MAIL FROM / RCPT TO / RSET as one write for a PIPELINING server.
+
+        The raw write skips the line-break check smtplib and aiosmtplib apply
+        to each command, so it is made here, as smtplib makes it: a CR or LF
+        in an address would inject a command and shift every reply after it.
+        """
+        if '\r' in email or '\n' in email or '\r' in sender_email or '\n' in sender_email:
+            raise ValueError("address contains prohibited newline characters")
+        return f'MAIL FROM:<{sender_email}>\r\nRCPT TO:<{email}>\r\nRSET\r\n'.encode('ascii')
+
+    def _rcpt(self, server: smtplib.SMTP, sender_email: str, email: str) -> Tuple[int, bytes]:
+        """
+        Run one MAIL FROM / RCPT TO / RSET envelope and return the RCPT reply.
+
+        When the server advertises PIPELINING (RFC 2920) the three commands
+        are written at once and their replies read back together, costing a
+        single round-trip instead of three.
+        """
+        if not server.has_extn('pipelining'):
+            server.mail(sender_email)
+            code, message = server.rcpt(email)
+            server.rset()
+            return code, message
+
+        server.send(self._pipelined_envelope(sender_email, email))
+        server.getreply()
+        code, message = server.getreply()
+        server.getreply()
+        return code, message
+
+    def verify_email_smtp(self, email: str) -> ValidationResult:
+        """
+        Verify email using SMTP with anti-spam measures and progress tracking
+        """
+        result = ValidationResult(email)
+        domain = email.rpartition('@')[2].lower()
+        self._prune_domain_state()
+
+        mx_record = self._precheck(email, result, domain)
+        if mx_record is None:
+            return result
+
+        helo_domain, sender_email = self._smtp_identity()
+
+        server = None
+        try:
+            server = self._open_smtp(mx_record, helo_domain)
+            server.mail(sender_email)
+            code, message = server.rcpt(email)
+            self._record_rcpt_reply(result, domain, code, message)
+        except Exception as e:
+            self._record_smtp_error(result, domain, e)
+            # A failed dialog is dropped without QUIT, and never left to the GC
+            self._close_smtp(server)
+        else:
+            # The verdict is in; a failing QUIT cannot turn it into an error
+            self._quit_smtp(server)
+
+        self._finish(email, result)
 
         return result
 
+    def verify_many(self, domain: str, emails: List[str]) -> List[ValidationResult]:
+        """
+        Verify several emails of one domain over a single SMTP session.
+
+        The MX host is connected and greeted once; each address then gets its
+        own MAIL FROM / RCPT TO envelope, reset with RSET before the next one.
+        A dropped connection is reopened once and the current address retried.
+        """
+        results = []
+        server = None
+        helo_domain, sender_email = self._smtp_identity()
+        self._prune_domain_state()
+
+        try:
+            for email in emails:
+                result = ValidationResult(email)
+                results.append(result)
+
+                mx_record = self._precheck(email, result, domain)
+                if mx_record is None:
+                    continue
+
+                paced = False
+                for attempt in range(2):
+                    try:
+                        if server is None:
+                            server = self._open_smtp(mx_record, helo_domain, esmtp=True)
+                            session_rcpts = 0
+                        # Pace real probes only, right before the RCPT so that
+                        # connecting does not eat into the spacing; emails
+                        # settled without SMTP do not wait
+                        if not paced:
+                            paced = True
+                            wait = self._probe_wait(domain)
+                            if wait > 0:
+                                time.sleep(wait)
+                        code, message = self._rcpt(server, sender_email, email)
+                        self._record_rcpt_reply(result, domain, code, message)
+                        session_rcpts += 1
+                        if self._session_spent(session_rcpts, code):
+                            self._quit_smtp(server)
+                            server = None
+                        break
+                    except smtplib.SMTPServerDisconnected as e:
+                        server = None
+                        if attempt:
+                            self._record_smtp_error(result, domain, e)
+                    except Exception as e:
+                        self._record_smtp_error(result, domain, e)
+                        self._close_smtp(server)
+                        server = None
+                        break
+
+                self._finish(email, result)
+        finally:
+            if server is not None:
+                self._quit_smtp(server)
+
+        return results
+
+    def _claim_mx_semaphore(self, mx_record: str) -> asyncio.Semaphore:
+        """Semaphore capping concurrent SMTP sessions to one MX host, held until _free_mx_semaphore"""
+        entry = self._mx_semaphores.get(mx_record)
+        if entry is None:
+            entry = self._mx_semaphores[mx_record] = [asyncio.Semaphore(self.max_sessions_per_mx), 0]
+        entry[1] += 1
+        return entry[0]
+
+    def _free_mx_semaphore(self, mx_record: str):
+        """Drop a session's claim on its MX host's semaphore, forgetting it once unclaimed"""
+        entry = self._mx_semaphores[mx_record]
+        entry[1] -= 1
+        if not entry[1]:
+            del self._mx_semaphores[mx_record]
+
+    def _session_semaphore(self) -> asyncio.Semaphore:
+        """Semaphore capping concurrent SMTP sessions overall at max_workers"""
+        # Created on first use, inside the running event loop
+        if self._session_slots is None:
+            self._session_slots = asyncio.Semaphore(self.max_workers)
+        return self._session_slots
+
+    async def _mx_address_async(self, mx_record: str) -> str:
+        """
+        Address to dial for `mx_record`, resolved at most once per MX_ADDRESS_TTL.
+
+        asyncio otherwise runs getaddrinfo in its thread pool for every new
+        session; a numeric host skips that lookup. IPv4 is preferred, as
+        only one address is dialed. The host name is returned unchanged
+        when resolution fails, leaving the error to the connect itself.
+        """
+        now = time.monotonic()
+        cached = self._mx_addresses.get(mx_record)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(mx_record, 25, type=socket.SOCK_STREAM)
+        except OSError:
+            return mx_record
+        if not infos:
+            return mx_record
+        address = next((info[4][0] for info in infos if info[0] == socket.AF_INET), infos[0][4][0])
+        self._mx_addresses[mx_record] = (address, now + MX_ADDRESS_TTL)
+        return address
+
+    async def _open_smtp_async(self, mx_record: str, helo_domain: str) -> aiosmtplib.SMTP:
+        """Connect to a mail server and greet it (EHLO, then HELO) without blocking the event loop"""
+        address = await self._mx_address_async(mx_record)
+        client = aiosmtplib.SMTP(hostname=address, port=25, timeout=self.timeout, start_tls=False)
+        try:
+            await client.connect()
+        except aiosmtplib.SMTPConnectError as e:
+            # A greeting with an error code still came from a reachable host
+            if not isinstance(e, aiosmtplib.SMTPConnectResponseError):
+                self._mark_unreachable(mx_record)
+            raise
+        try:
+            try:
+                await client.ehlo(helo_domain)
+            except aiosmtplib.SMTPHeloError:
+                await client.helo(helo_domain)
+        except Exception:
+            # The caller only ever sees a greeted client; drop this one here
+            self._close_smtp(client)
+            raise
+        return client
+
+    async def _rcpt_async(self, client: aiosmtplib.SMTP, sender_email: str, email: str) -> Tuple[int, str]:
+        """Run one MAIL FROM / RCPT TO / RSET envelope and return the RCPT reply"""
+        if client.supports_extension('pipelining'):
+            # Single round-trip, as in _rcpt
+            client.protocol.write(self._pipelined_envelope(sender_email, email))
+            await client.protocol.read_response(timeout=self.timeout)
+            response = await client.protocol.read_response(timeout=self.timeout)
+            await client.protocol.read_response(timeout=self.timeout)
+            return response.code, response.message
+
+        await client.mail(sender_email)
+        try:
+            response = await client.rcpt(email)
+            code, message = response.code, response.message
+        except aiosmtplib.SMTPRecipientRefused as e:
+            code, message = e.code, e.message
+        await client.rset()
+        return code, message
+
+    async def verify_email_smtp_async(self, email: str) -> ValidationResult:
+        """Async counterpart of verify_email_smtp built on aiosmtplib"""
+        domain = email.rpartition('@')[2].lower()
+        results = await self.verify_many_async(domain, [email])
+        return results[0]
+
+    async def verify_many_async(self, domain: str, emails: List[str]) -> List[ValidationResult]:
+        """
+        Async counterpart of verify_many built on aiosmtplib.
+
+        The session holds a slot of its MX host's semaphore, so concurrent
+        domains that share a mail server stay within max_sessions_per_mx,
+        and one of the max_workers slots shared by all sessions.
+        """
+        results = []
+        client = None
+        mx_host = None
+        mx_slot = None
+        session_slot = None
+        helo_domain, sender_email = self._smtp_identity()
+        self._prune_domain_state()
+
+        try:
+            for email in emails:
+                result = ValidationResult(email)
+                results.append(result)
+
+                mx_record = await self._precheck_async(email, result, domain)
+                if mx_record is None:
+                    continue
+
+                if mx_host is None:
+                    mx_host = mx_record
+                    semaphore = self._claim_mx_semaphore(mx_record)
+                    await semaphore.acquire()
+                    mx_slot = semaphore
+                    semaphore = self._session_semaphore()
+                    await semaphore.acquire()
+                    session_slot = semaphore
+
+                paced = False
+                for attempt in range(2):
+                    try:
+                        if client is None:
+                            client = await self._open_smtp_async(mx_record, helo_domain)
+                            session_rcpts = 0
+                        # Pace real probes only, as in verify_many. The slot is
+                        # booked right before the RCPT, not while the session
+                        # queues for a semaphore or connects, so the spacing
+                        # holds across contended sessions
+                        if not paced:
+                            paced = True
+                            wait = self._probe_wait(domain)
+                            if wait > 0:
+                                await asyncio.sleep(wait)
+                        code, message = await self._rcpt_async(client, sender_email, email)
+                        self._record_rcpt_reply(result, domain, code, message)
+                        session_rcpts += 1
+                        if self._session_spent(session_rcpts, code):
+                            await self._quit_smtp_async(client)
+                            client = None
+                        break
+                    except aiosmtplib.SMTPServerDisconnected as e:
+                        client = None
+                        if attempt:
+                            self._record_smtp_error(result, domain, e)
+                    except Exception as e:
+                        self._record_smtp_error(result, domain, e)
+                        self._close_smtp(client)
+                        client = None
+                        break
+
+                self._finish(email, result)
+        finally:
+            if client is not None:
+                await self._quit_smtp_async(client)
+            for slot in (session_slot, mx_slot):
+                if slot is not None:
+                    slot.release()
+            if mx_host is not None:
+                self._free_mx_semaphore(mx_host)
+
+        return results
+
+    @staticmethod
+    def _session_spent(session_rcpts: int, code: int) -> bool:
+        """Whether an SMTP session should be recycled before the next envelope"""
+        # A 4xx reply is a temporary refusal (greylisting, 421 closing, 452 too
+        # many recipients) that a fresh session may not get
+        return session_rcpts >= MAX_RCPT_PER_SESSION or 400 <= code < 500
+
+    def _quit_smtp(self, server: smtplib.SMTP):
+        """End a session politely, dropping it if QUIT fails"""
+        try:
+            server.quit()
+        except Exception:
+            self._close_smtp(server)
+
+    async def _quit_smtp_async(self, client: aiosmtplib.SMTP):
+        """Async counterpart of _quit_smtp"""
+        try:
+            await client.quit()
+        except Exception:
+            self._close_smtp(client)
+
+    def _close_smtp(self, server):
+        """Drop a connection without waiting on the server"""
+        if server is None:
+            return
+        try:
+            server.close()
+        except Exception:
+            pass
+
     def _handle_domain_error(self, domain: str):
         """Handle domain-specific errors and adjust delays"""
         self.domain_error_counts[domain] += 1
         if self.domain_error_counts[domain] > 3:
             # Exponential backoff for problematic domains
-            self.domain_delays[domain] = min(self.domain_delays[domain] * 1.5, 10.0)
-            logger.debug(f"Increased delay for {domain} to {self.domain_delays[domain]:.1f}s")
+            self.domain_delays[domain] = min(self.domain_delays.get(domain, self.delay) * 1.5, 10.0)
+            logger.debug("Increased delay for %s to %.1fs", domain, self.domain_delays[domain])
 
     def get_domain_delay(self, email: str) -> float:
         """Get domain-specific delay"""
         domain = email.split('@')[1].lower()
-        return self.domain_delays[domain]
+        return self.domain_delays.get(domain, self.delay)
+
+    def _prune_domain_state(self):
+        """
+        Forget the per-domain and per-MX entries that no longer affect a check.
+
+        Runs at most once per DOMAIN_STATE_PRUNE_INTERVAL. Only entries past
+        their expiry are dropped, each of which behaves exactly like a
+        missing one: a probe slot already open, an MX host's unreachable
+        window or address lifetime over, a rate-limit window with no checks
+        left in it.
+        """
+        now = time.monotonic()
+        if now < self._next_prune_at:
+            return
+        self._next_prune_at = now + DOMAIN_STATE_PRUNE_INTERVAL
+
+        for entries in (self._next_probe_at, self._unreachable_mx):
+            for key in [key for key, until in entries.items() if until <= now]:
+                del entries[key]
+        for key in [key for key, (_, expires_at) in self._mx_addresses.items() if expires_at <= now]:
+            del self._mx_addresses[key]
+        for domain in [domain for domain, requests in self.requests_per_domain.items()
+                       if not requests or now - requests[-1] > RATE_LIMIT_WINDOW]:
+            del self.requests_per_domain[domain]
+
+    def _probe_wait(self, domain: str) -> float:
+        """
+        Reserve the domain's next probe slot and return how long until it opens.
+
+        Each domain keeps the time its next probe may start; a probe only
+        waits for whatever is left of the delay since the previous one, so
+        a domain that has been idle longer than its delay is probed at once.
+        """
+        now = time.monotonic()
+        opens_at = self._next_probe_at.get(domain, now)
+        if opens_at < now:
+            opens_at = now
+        self._next_probe_at[domain] = opens_at + self.get_probe_delay(domain)
+        return opens_at - now
+
+    def get_probe_delay(self, domain: str) -> float:
+        """Get the wait before the next probe to a domain, with anti-spam jitter"""
+        delay = self.domain_delays.get(domain, self.delay)
+        if self.anti_spam_mode:
+            delay += next(self._jitter)
+        return delay
+
+
+def _open_csv_for_read(path: str):
+    """
+    Open an input CSV for one sequential pass.
+
+    The kernel is told the file will be read front to back, which widens
+    its readahead on large inputs (a no-op where posix_fadvise is missing).
+    """
+    csvfile = open(path, 'r', encoding='utf-8', newline='', buffering=CSV_BUFFER_SIZE)
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(csvfile.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+    return csvfile
+
+
+def _iter_rows(reader, header: List[str]) -> Iterator[Dict]:
+    """
+    Yield the rows of a csv.reader as dicts keyed by `header`.
+
+    Same rows as csv.DictReader, but a well-formed row costs only a
+    dict(zip()); blank lines are skipped and ragged rows are shaped the
+    way DictReader would shape them.
+    """
+    width = len(header)
+    for values in reader:
+        if len(values) == width:
+            yield dict(zip(header, values))
+        elif values:
+            row = dict(zip(header, values))
+            if len(values) > width:
+                row[None] = values[width:]
+            else:
+                row.update(dict.fromkeys(header[len(values):]))
+            yield row
+
+
+def _interleave_by_domain(rows: List[Dict], start: int = 1) -> List[Tuple[int, Dict]]:
+    """
+    Order rows round-robin across their domains, keeping each 1-based input index.
+
+    Consecutive rows then belong to different domains: a batch spreads over
+    as many mail servers as possible, and one domain's probes are spread
+    over the run instead of arriving back to back.
+    """
+    groups = defaultdict(list)
+    for i, row in enumerate(rows, start):
+        groups[(row.get('email') or '').strip().lower().rpartition('@')[2]].append((i, row))
+    interleaved = itertools.chain.from_iterable(itertools.zip_longest(*groups.values()))
+    return [email_data for email_data in interleaved if email_data is not None]
+
+
+def _iter_batches(reader, batch_size: int) -> Iterator[List[Tuple[int, Dict]]]:
+    """
+    Yield batches of (index, row) from a CSV reader without loading the whole file.
+
+    Rows are read READ_WINDOW_ROWS at a time and interleaved by domain
+    within each window, so memory stays bounded by the window size.
+    """
+    start = 1
+    while True:
+        window = list(itertools.islice(reader, READ_WINDOW_ROWS))
+        if not window:
+            return
+        ordered_rows = _interleave_by_domain(window, start)
+        start += len(window)
+        for i in range(0, len(ordered_rows), batch_size):
+            yield ordered_rows[i:i + batch_size]
+
+
+def _mx_prefetch_domains(validator: EmailValidator, rows) -> set:
+    """Domains of the well-formed emails in `rows`, the ones worth an MX lookup"""
+    emails = ((row.get('email') or '').strip().lower() for row in rows)
+    return {email.rpartition('@')[2] for email in emails if validator.is_valid_format(email)}
 
 
 async def validate_email_batch(validator: EmailValidator, emails_batch: List[Tuple[int, Dict]], 
                                csv_writer: StreamingCSVWriter, fieldnames: List[str]) -> Tuple[int, int]:
-    """Validate a batch of emails concurrently with streaming output"""
+    """Validate a batch of emails concurrently with streaming output.
+
+    Rows are grouped by domain: within the batch each domain is worked
+    through serially over one SMTP session, while distinct domains are
+    validated concurrently.
+
+    The pipeline keeps up to MAX_PENDING_BATCHES batches in flight, so one
+    domain can have sessions open from several batches at once. Those are
+    bounded by max_sessions_per_mx per MX host and max_workers overall,
+    with probes to the domain still spaced by its delay. An address
+    repeated across two in-flight batches may be probed twice, as neither
+    verdict is cached yet when the other starts.
+    """
     valid_count = 0
     invalid_count = 0
+
+    blank = dict.fromkeys(fieldnames, '')
+    scratch = dict(blank)
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+
+    # Each row's normalized email and domain are computed once, here
+    domain_groups = defaultdict(list)
+    for i, row in emails_batch:
+        # A ragged row may have no email value at all; the format check rejects it
+        email = (row.get('email') or '').strip().lower()
+        domain_groups[email.rpartition('@')[2]].append((i, row, email))
+
+    # Resolve the batch's MX records concurrently before any SMTP work
+    await validator.prefetch_mx_records(
+        domain for domain, group in domain_groups.items() if validator.is_valid_format(group[0][2])
+    )
     
-    async def validate_single(email_data):
+    def record_result(i: int, row: Dict, email: str, validation_result: Dict):
         nonlocal valid_count, invalid_count
+
+        # Fill the shared scratch row in place, its key set fixed to fieldnames,
+        # so no dict is allocated or resized per email. Resetting it first keeps
+        # a row that lacks a column from inheriting the previous row's value
+        scratch.update(blank)
+        if None in row and None not in blank:
+            # Surplus values of a ragged row (DictReader's restkey) have no column
+            row = {key: value for key, value in row.items() if key is not None}
+        scratch.update(row)
+        scratch['email_original'] = row.get('email') or ''
+        scratch['email'] = email
+        scratch['email_valid'] = validation_result['valid']
+        scratch['validation_reason'] = validation_result['reason']
+        scratch['format_valid'] = validation_result['format_valid']
+        scratch['domain_exists'] = validation_result['domain_exists']
+        scratch['smtp_valid'] = validation_result['smtp_valid']
         
-        i, row = email_data
-        email = row['email'].strip().lower()
-        
-        # Skip if already processed (resume capability)
-        if validator.progress_tracker and validator.progress_tracker.is_processed(email):
-            logger.info(f"Skipped {i}: {email} - Already processed")
-            return
-        
-        # Use domain-specific delay with anti-spam jitter
-        domain_delay = validator.get_domain_delay(email)
-        if validator.anti_spam_mode:
-            jitter = random.uniform(0.1, 0.5)
-            domain_delay += jitter
-        await asyncio.sleep(domain_delay)
-        
-        # Run sync validation in thread pool
-        loop = asyncio.get_event_loop()
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            validation_result = await loop.run_in_executor(
-                executor, validator.verify_email_smtp, email
-            )
-        
-        row_with_validation = row.copy()
-        row_with_validation.update({
-            'email_original': row['email'],
-            'email': email,
-            'email_valid': validation_result['valid'],
-            'validation_reason': validation_result['reason'],
-            'format_valid': validation_result['format_valid'],
-            'domain_exists': validation_result['domain_exists'],
-            'smtp_valid': validation_result['smtp_valid']
-        })
-        
-        # Stream write immediately
-        csv_writer.write_result(row_with_validation, fieldnames)
+        # Stream write immediately (the writer does not keep the row)
+        csv_writer.write_result(scratch, fieldnames)
+        # Marked only once its row is queued: other batches may checkpoint while
+        # this one is still probing, and a mark must never outrun its row
+        if validator.progress_tracker:
+            validator.progress_tracker.mark_processed(email)
         
         # Update counters
         if validation_result['valid']:
@@ -333,24 +1295,50 @@ async def validate_email_batch(validator: EmailValidator, emails_batch: List[Tup
         else:
             invalid_count += 1
             
-        status = "✓ Valid" if validation_result['valid'] else f"✗ Invalid - {validation_result['reason']}"
-        logger.info(f"Processed {i}: {email} - {status}")
-        
-        # Save progress periodically
-        if validator.progress_tracker and (valid_count + invalid_count) % 50 == 0:
-            validator.progress_tracker.save_progress()
-    
-    # Process batch concurrently
-    tasks = [validate_single(email_data) for email_data in emails_batch]
+        if debug_enabled:
+            status = "✓ Valid" if validation_result['valid'] else f"✗ Invalid - {validation_result['reason']}"
+            logger.debug("Processed %d: %s - %s", i, email, status)
+
+    async def validate_domain(domain: str, group: List[Tuple[int, Dict, str]]):
+        pending = []
+        for i, row, email in group:
+            # Skip if processed by a previous run (resume capability); duplicates
+            # of this run's emails are still written, with the cached verdict or,
+            # once it is evicted from result_cache, after a fresh probe
+            if validator.progress_tracker and validator.progress_tracker.is_processed(email):
+                logger.debug("Skipped %d: %s - Already processed", i, email)
+                continue
+            pending.append((i, row, email))
+
+        if not pending:
+            return
+
+        # Probe the whole group over one SMTP session on the event loop; the
+        # validator paces each probe against the domain's previous one
+        try:
+            results = await validator.verify_many_async(domain, [email for _, _, email in pending])
+        except Exception as e:
+            logger.error("Error validating domain %s: %s", domain, e)
+            return
+
+        for (i, row, email), validation_result in zip(pending, results):
+            record_result(i, row, email, validation_result)
+
+    # Process domains concurrently, emails within a domain sequentially
+    tasks = [validate_domain(domain, group) for domain, group in domain_groups.items()]
     await asyncio.gather(*tasks, return_exceptions=True)
-    
+
     return valid_count, invalid_count
 
 async def process_csv_file_async(input_file: str, output_file: str, delay: float = 1.5, 
                                 max_workers: int = 20, skip_smtp: bool = False, 
-                                anti_spam_mode: bool = True, resume: bool = True):
+                                anti_spam_mode: bool = True, resume: bool = True,
+                                split_output: bool = True, format_only_domains=FORMAT_ONLY_DOMAINS):
     """
     Process CSV file with streaming output, resume capability, and anti-spam measures
+
+    Results stream into one combined file; with `split_output` the valid
+    and invalid files are derived from it once the run ends.
     """
     # Setup progress tracking
     progress_file = f"{input_file}.progress"
@@ -362,25 +1350,33 @@ async def process_csv_file_async(input_file: str, output_file: str, delay: float
         max_workers=max_workers, 
         skip_smtp=skip_smtp,
         anti_spam_mode=anti_spam_mode,
-        progress_tracker=progress_tracker
+        progress_tracker=progress_tracker,
+        format_only_domains=format_only_domains
     )
     
+    # MX lookups are kept next to the progress file so a resumed run starts warm
+    mx_cache_file = f"{input_file}.mxcache.json"
+    if resume:
+        validator.mx_cache.load(mx_cache_file)
+    
     # Setup streaming CSV writer
     csv_writer = StreamingCSVWriter(output_file)
     
+    total_rows = 0
     total_valid = 0
     total_invalid = 0
     
     try:
-        with open(input_file, 'r', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            rows = list(reader)
-            total_rows = len(rows)
+        with _open_csv_for_read(input_file) as csvfile:
+            reader = csv.reader(csvfile)
+            header = next(reader, None) or []
+            batches = _iter_batches(_iter_rows(reader, header), max_workers)
+            batch = next(batches, None)
             
             # Get fieldnames for CSV output
-            if rows:
+            if batch:
                 sample_result = {
-                    **rows[0],
+                    **batch[0][1],
                     'email_original': '',
                     'email': '',
                     'email_valid': False,
@@ -394,34 +1390,67 @@ async def process_csv_file_async(input_file: str, output_file: str, delay: float
                 logger.error("No data found in input file")
                 return
             
-            # Count already processed emails for resume
-            already_processed = 0
-            if progress_tracker:
-                already_processed = len([r for r in rows if progress_tracker.is_processed(r['email'].strip().lower())])
+            # Already processed rows are skipped (and logged) as their batch comes up;
+            # the tracker's size stands in for a separate pass over the input
+            already_processed = len(progress_tracker.processed_emails) if progress_tracker else 0
+            logger.info("Processing emails from %s (resume: %s, anti-spam: %s, already processed: %d)",
+                        input_file, resume, anti_spam_mode, already_processed)
+            logger.info("Max workers: %d, Skip SMTP: %s", max_workers, skip_smtp)
             
-            remaining = total_rows - already_processed
-            logger.info(f"Processing {remaining}/{total_rows} emails (resume: {resume}, anti-spam: {anti_spam_mode})")
-            logger.info(f"Max workers: {max_workers}, Skip SMTP: {skip_smtp}")
+            # Batches are submitted ahead, up to MAX_PENDING_BATCHES at a time; the
+            # validator's session semaphore keeps max_workers SMTP sessions busy
+            # instead of letting every batch wait for its slowest domain
+            def tally(done_batches):
+                nonlocal total_valid, total_invalid
+                for task in done_batches:
+                    batch_valid, batch_invalid = task.result()
+                    done_before = total_valid + total_invalid
+                    total_valid += batch_valid
+                    total_invalid += batch_invalid
+
+                    # Aggregated progress instead of a line per email
+                    done = total_valid + total_invalid
+                    if done // PROGRESS_LOG_INTERVAL > done_before // PROGRESS_LOG_INTERVAL:
+                        logger.info("Processed %d emails (valid=%d, invalid=%d)",
+                                    done, total_valid, total_invalid)
+                
+                # Checkpoint as batches complete: rows first, so the progress log
+                # never vouches for a row that is not on disk
+                csv_writer.flush()
+                if progress_tracker:
+                    progress_tracker.save_progress()
             
-            # Process in batches to control concurrency
-            batch_size = max_workers
-            for i in range(0, total_rows, batch_size):
-                batch = [(j + 1, rows[j]) for j in range(i, min(i + batch_size, total_rows))]
+            prefetch = None
+            pending = set()
+            batch_num = 0
+            while batch:
+                next_batch = next(batches, None)
                 
-                batch_num = i//batch_size + 1
-                total_batches = (total_rows + batch_size - 1)//batch_size
-                logger.info(f"Processing batch {batch_num}/{total_batches}")
+                # Resolve the next batch's MX records while this one is probed
+                if prefetch is not None:
+                    await prefetch
+                prefetch = asyncio.ensure_future(validator.prefetch_mx_records(_mx_prefetch_domains(
+                    validator, (row for _, row in next_batch or ())
+                )))
                 
-                batch_valid, batch_invalid = await validate_email_batch(
-                    validator, batch, csv_writer, fieldnames
-                )
+                batch_num += 1
+                total_rows += len(batch)
+                logger.debug("Processing batch %d", batch_num)
                 
-                total_valid += batch_valid
-                total_invalid += batch_invalid
+                pending.add(asyncio.ensure_future(validate_email_batch(
+                    validator, batch, csv_writer, fieldnames
+                )))
+                if len(pending) >= MAX_PENDING_BATCHES:
+                    done_batches, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    tally(done_batches)
                 
-                # Save progress after each batch
-                if progress_tracker:
-                    progress_tracker.save_progress()
+                batch = next_batch
+            
+            if pending:
+                done_batches, _ = await asyncio.wait(pending)
+                tally(done_batches)
+            if prefetch is not None:
+                await prefetch
     
     except FileNotFoundError:
         logger.error(f"Input file '{input_file}' not found")
@@ -430,9 +1459,17 @@ async def process_csv_file_async(input_file: str, output_file: str, delay: float
         logger.error(f"Error reading input file: {e}")
         return
     finally:
+        csv_writer.close()
+        if split_output:
+            try:
+                csv_writer.split_results()
+            except Exception as e:
+                logger.error(f"Could not split results file: {e}")
+        
         # Final progress save
         if progress_tracker:
-            progress_tracker.save_progress()
+            progress_tracker.compact()
+            validator.mx_cache.save(mx_cache_file)
     
     # Print summary
     total_processed = total_valid + total_invalid
@@ -440,100 +1477,141 @@ async def process_csv_file_async(input_file: str, output_file: str, delay: float
         logger.warning("No emails were processed.")
         return
         
-    logger.info(f"\n=== SUMMARY ===")
-    logger.info(f"Total emails processed this session: {total_processed}")
-    logger.info(f"Valid emails: {total_valid} ({total_valid / total_processed * 100:.1f}%)")
-    logger.info(f"Invalid emails: {total_invalid} ({total_invalid / total_processed * 100:.1f}%)")
-    logger.info(f"Results written to:")
-    logger.info(f"  - Valid: {csv_writer.valid_filename}")
-    logger.info(f"  - Invalid: {csv_writer.invalid_filename}")
-    logger.info(f"  - Combined: {csv_writer.results_filename}")
+    logger.info("\n=== SUMMARY ===")
+    logger.info("Total emails processed this session: %d", total_processed)
+    logger.info("Rows skipped this session: %d", total_rows - total_processed)
+    logger.info("Valid emails: %d (%.1f%%)", total_valid, total_valid / total_processed * 100)
+    logger.info("Invalid emails: %d (%.1f%%)", total_invalid, total_invalid / total_processed * 100)
+    logger.info("Results written to:")
+    if split_output:
+        logger.info("  - Valid: %s", csv_writer.valid_filename)
+        logger.info("  - Invalid: %s", csv_writer.invalid_filename)
+    logger.info("  - Combined: %s", csv_writer.results_filename)
     
     # Clean up progress file if completed
     if resume and total_processed > 0:
-        logger.info(f"Progress saved to: {progress_file} (delete to restart from beginning)")
+        logger.info("Progress saved to: %s (delete to restart from beginning)", progress_file)
 
 def process_csv_file(input_file: str, output_file: str, delay: float = 1.5, 
                     max_workers: int = 20, skip_smtp: bool = False, 
-                    anti_spam_mode: bool = True, resume: bool = True):
+                    anti_spam_mode: bool = True, resume: bool = True,
+                    split_output: bool = True, format_only_domains=FORMAT_ONLY_DOMAINS):
     """
     Wrapper for async processing with all new features
     """
     asyncio.run(process_csv_file_async(
-        input_file, output_file, delay, max_workers, skip_smtp, anti_spam_mode, resume
+        input_file, output_file, delay, max_workers, skip_smtp, anti_spam_mode, resume,
+        split_output, format_only_domains
     ))
 
 
 def write_results(valid_emails: List[Dict], invalid_emails: List[Dict], base_filename: str):
-    """Write results to separate files"""
+    """
+    Write already collected results to separate files.
+
+    The CSV pipeline streams rows through StreamingCSVWriter instead; this
+    is kept for callers that hold their results in memory.
+    """
 
     if not valid_emails and not invalid_emails:
         logger.warning("No data to write")
         return
 
     # Get fieldnames (assuming all rows have same structure)
-    all_emails = valid_emails + invalid_emails
-    if all_emails:
-        fieldnames = list(all_emails[0].keys())
-
-    # Write valid emails
-    if valid_emails:
-        valid_filename = base_filename.replace('.csv', '_valid.csv')
-        with open(valid_filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(valid_emails)
-        logger.info(f"Valid emails written to: {valid_filename}")
-
-    # Write invalid emails
-    if invalid_emails:
-        invalid_filename = base_filename.replace('.csv', '_invalid.csv')
-        with open(invalid_filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(invalid_emails)
-        logger.info(f"Invalid emails written to: {invalid_filename}")
-
-    # Write combined results
-    combined_filename = base_filename.replace('.csv', '_results.csv')
-    with open(combined_filename, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(all_emails)
-    logger.info(f"Combined results written to: {combined_filename}")
+    fieldnames = list((valid_emails or invalid_emails)[0].keys())
+
+    # Rows are rendered positionally, once each, into a reused buffer and the
+    # text is written to both their own file and the combined one
+    buffer = io.StringIO()
+    line_writer = csv.writer(buffer)
+
+    def render(values) -> str:
+        buffer.seek(0)
+        buffer.truncate()
+        line_writer.writerow(values)
+        return buffer.getvalue()
+
+    header = render(fieldnames)
+    valid_filename, invalid_filename, combined_filename = _derive_paths(base_filename)
+    with open(combined_filename, 'w', newline='', encoding='utf-8',
+              buffering=CSV_BUFFER_SIZE) as combined_file:
+        combined_file.write(header)
+
+        # Valid emails first, then invalid ones, as in the combined file before
+        for label, rows, filename in (('Valid', valid_emails, valid_filename),
+                                      ('Invalid', invalid_emails, invalid_filename)):
+            if not rows:
+                continue
+            with open(filename, 'w', newline='', encoding='utf-8',
+                      buffering=CSV_BUFFER_SIZE) as csvfile:
+                csvfile.write(header)
+                for row in rows:
+                    line = render([row.get(field, '') for field in fieldnames])
+                    csvfile.write(line)
+                    combined_file.write(line)
+            logger.info("%s emails written to: %s", label, filename)
+    logger.info("Combined results written to: %s", combined_filename)
+
+
+# Printed when the command is run without arguments
+USAGE = """\
+Usage: email-validation <input_file.csv> [output_file.csv] [delay_seconds] [max_workers] [flags]
+Flags: --skip-smtp, --no-anti-spam, --no-resume, --no-split, --smtp-skip-domains=<domain,...>
+Examples:
+  email-validation emails.csv results.csv 1.0 50
+  email-validation emails.csv results.csv 0.5 30 --skip-smtp
+  email-validation huge_list.csv results.csv 0.2 100 --no-anti-spam
+  email-validation emails.csv results.csv 1.0 20 --no-resume"""
 
 
 def main():
     """Main function with streaming output, resume, and anti-spam features"""
     if len(sys.argv) < 2:
-        print("Usage: email-validation <input_file.csv> [output_file.csv] [delay_seconds] [max_workers] [flags]")
-        print("Flags: --skip-smtp, --no-anti-spam, --no-resume")
-        print("Examples:")
-        print("  email-validation emails.csv results.csv 1.0 50")
-        print("  email-validation emails.csv results.csv 0.5 30 --skip-smtp")
-        print("  email-validation huge_list.csv results.csv 0.2 100 --no-anti-spam")
-        print("  email-validation emails.csv results.csv 1.0 20 --no-resume")
+        print(USAGE)
         sys.exit(1)
 
-    input_file = sys.argv[1]
-    output_file = sys.argv[2] if len(sys.argv) > 2 else 'cleaned_emails.csv'
-    delay = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
-    max_workers = int(sys.argv[4]) if len(sys.argv) > 4 else 20
+    parser = argparse.ArgumentParser(prog='email-validation', description=__doc__)
+    parser.add_argument('input_file')
+    parser.add_argument('output_file', nargs='?', default='cleaned_emails.csv')
+    parser.add_argument('delay', nargs='?', type=float, default=1.0, help='seconds between probes to a domain')
+    parser.add_argument('max_workers', nargs='?', type=int, default=20, help='concurrent SMTP sessions')
+    parser.add_argument('--skip-smtp', action='store_true')
+    parser.add_argument('--no-anti-spam', dest='anti_spam_mode', action='store_false')
+    parser.add_argument('--no-resume', dest='resume', action='store_false')
+    parser.add_argument('--no-split', dest='split_output', action='store_false',
+                        help='only write the combined results file')
+    parser.add_argument('--smtp-skip-domains', metavar='DOMAIN,...',
+                        help='providers validated by format and MX only (replaces the built-in list)')
+    # Flags may come before, between or after the positionals
+    args = parser.parse_intermixed_args()
+
+    input_file = args.input_file
+    output_file = args.output_file
+    delay = args.delay
+    max_workers = args.max_workers
+    skip_smtp = args.skip_smtp
+    anti_spam_mode = args.anti_spam_mode
+    resume = args.resume
     
-    # Parse flags
-    skip_smtp = '--skip-smtp' in sys.argv
-    anti_spam_mode = '--no-anti-spam' not in sys.argv
-    resume = '--no-resume' not in sys.argv
-
-    logger.info(f"Input file: {input_file}")
-    logger.info(f"Output base: {output_file}")
-    logger.info(f"Delay between checks: {delay} seconds")
-    logger.info(f"Max concurrent workers: {max_workers}")
-    logger.info(f"Skip SMTP verification: {skip_smtp}")
-    logger.info(f"Anti-spam mode: {anti_spam_mode}")
-    logger.info(f"Resume capability: {resume}")
-
-    process_csv_file(input_file, output_file, delay, max_workers, skip_smtp, anti_spam_mode, resume)
+    # Only options that were given are forwarded, keeping process_csv_file's defaults otherwise
+    options = {}
+    if not args.split_output:
+        options['split_output'] = False
+    if args.smtp_skip_domains is not None:
+        domains = args.smtp_skip_domains.lower().split(',')
+        options['format_only_domains'] = frozenset(filter(None, map(str.strip, domains)))
+
+    logger.info("Input file: %s", input_file)
+    logger.info("Output base: %s", output_file)
+    logger.info("Delay between checks: %s seconds", delay)
+    logger.info("Max concurrent workers: %d", max_workers)
+    logger.info("Skip SMTP verification: %s", skip_smtp)
+    logger.info("Anti-spam mode: %s", anti_spam_mode)
+    logger.info("Resume capability: %s", resume)
+    if 'format_only_domains' in options:
+        logger.info("SMTP skipped for domains: %s", ', '.join(sorted(options['format_only_domains'])) or 'none')
+
+    process_csv_file(input_file, output_file, delay, max_workers, skip_smtp, anti_spam_mode, resume, **options)
 
 
 if __name__ == "__main__":
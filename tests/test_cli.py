@@ -55,11 +55,43 @@ class TestCLI:
                     sample_csv_file, output_file, 1.0, 20, True, False, True
                 )
 
+    def test_main_with_smtp_skip_domains(self, sample_csv_file, temp_dir):
+        """Test CLI with a custom SMTP skip list."""
+        output_file = os.path.join(temp_dir, "output.csv")
+
+        with patch.object(sys, 'argv', ['email_validator.py', sample_csv_file, output_file, '1.0', '20',
+                                        '--smtp-skip-domains=Gmail.com, example.org']):
+            with patch('email_validation.cli.process_csv_file') as mock_process:
+                main()
+                mock_process.assert_called_once_with(
+                    sample_csv_file, output_file, 1.0, 20, False, True, True,
+                    format_only_domains=frozenset({'gmail.com', 'example.org'})
+                )
+
+    def test_main_with_no_split(self, sample_csv_file):
+        """Test that --no-split is forwarded and can precede positionals."""
+        with patch.object(sys, 'argv', ['email_validator.py', '--no-split', sample_csv_file, 'out.csv']):
+            with patch('email_validation.cli.process_csv_file') as mock_process:
+                main()
+                mock_process.assert_called_once_with(
+                    sample_csv_file, 'out.csv', 1.0, 20, False, True, True, split_output=False
+                )
+
     def test_main_with_invalid_delay(self, sample_csv_file):
         """Test CLI with invalid delay parameter."""
         with patch.object(sys, 'argv', ['email_validator.py', sample_csv_file, 'output.csv', 'invalid']):
-            with pytest.raises(ValueError):
+            with pytest.raises(SystemExit) as exc_info:
                 main()
+            assert exc_info.value.code == 2
+
+    def test_main_with_intermixed_flags(self, sample_csv_file):
+        """Test that flags may appear between the positional arguments."""
+        with patch.object(sys, 'argv', ['email_validator.py', sample_csv_file, '--skip-smtp', 'out.csv', '2.0']):
+            with patch('email_validation.cli.process_csv_file') as mock_process:
+                main()
+                mock_process.assert_called_once_with(
+                    sample_csv_file, 'out.csv', 2.0, 20, True, True, True
+                )
 
     @patch('email_validation.cli.logger')
     def test_main_logs_parameters(self, mock_logger, sample_csv_file, temp_dir):
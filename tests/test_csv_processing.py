@@ -1,13 +1,18 @@
 """Integration tests for CSV processing functionality."""
 
 import pytest
+import asyncio
 import csv
+import json
 import tempfile
 import os
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 from pathlib import Path
 
-from email_validation.cli import process_csv_file, write_results
+from email_validation.cli import (
+    process_csv_file, write_results, validate_email_batch, StreamingCSVWriter, ProgressTracker,
+    _interleave_by_domain, _derive_paths, _iter_rows,
+)
 
 
 class TestCSVProcessing:
@@ -73,8 +78,11 @@ class TestCSVProcessing:
                         'smtp_valid': False
                     }
 
-            mock_validator.verify_email_smtp.side_effect = mock_verify
-            mock_validator.get_domain_delay.return_value = 0.1
+            mock_validator.verify_many_async = AsyncMock(side_effect=lambda domain, emails: [
+                mock_verify(email) for email in emails
+            ])
+            mock_validator.get_probe_delay.return_value = 0.1
+            mock_validator.prefetch_mx_records = AsyncMock()
 
             # Process the CSV with all required parameters
             process_csv_file(input_file, output_file, delay=0.1, max_workers=1,
@@ -207,6 +215,94 @@ class TestCSVProcessing:
         import shutil
         shutil.rmtree(temp_dir)
 
+    def test_streaming_writer_appends_on_resume(self):
+        """Test that a second writer session appends rows and splits them at the end."""
+        temp_dir = tempfile.mkdtemp()
+        base_filename = os.path.join(temp_dir, "output.csv")
+        fieldnames = ['email', 'email_valid']
+
+        for email in ('first@example.com', 'second@example.com'):
+            csv_writer = StreamingCSVWriter(base_filename)
+            csv_writer.write_result({'email': email, 'email_valid': True}, fieldnames)
+            csv_writer.close()
+
+        with open(csv_writer.results_filename, 'r', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        assert [row['email'] for row in rows] == ['first@example.com', 'second@example.com']
+        assert not os.path.exists(csv_writer.valid_filename)
+
+        csv_writer.split_results()
+        with open(csv_writer.valid_filename, 'r', encoding='utf-8') as f:
+            assert list(csv.DictReader(f)) == rows
+        assert not os.path.exists(csv_writer.invalid_filename)
+
+        # Cleanup
+        import shutil
+        shutil.rmtree(temp_dir)
+
+    def test_progress_tracker_log_and_compact(self):
+        """Test that progress survives an interrupted run and compacts to JSON."""
+        temp_dir = tempfile.mkdtemp()
+        progress_file = os.path.join(temp_dir, "emails.csv.progress")
+
+        tracker = ProgressTracker(progress_file)
+        tracker.mark_processed("first@example.com")
+        tracker.mark_processed("second@example.com")
+        tracker.save_progress()
+
+        # A run that stops without compacting resumes from the log
+        resumed = ProgressTracker(progress_file)
+        assert resumed.is_processed("first@example.com")
+        assert resumed.is_processed("second@example.com")
+
+        resumed.mark_processed("third@example.com")
+        resumed.compact()
+        assert not os.path.exists(resumed.log_file)
+        assert len(ProgressTracker(progress_file).processed_emails) == 3
+
+        # Cleanup
+        import shutil
+        shutil.rmtree(temp_dir)
+
+    def test_progress_tracker_marks_wait_for_checkpoint(self, tmp_path):
+        """Test that marks reach the log only when progress is saved."""
+        progress_file = str(tmp_path / "emails.csv.progress")
+
+        tracker = ProgressTracker(progress_file)
+        tracker.mark_processed("first@example.com")
+        assert not os.path.exists(tracker.log_file)
+        assert not ProgressTracker(progress_file).is_processed("first@example.com")
+
+        tracker.save_progress()
+        assert ProgressTracker(progress_file).is_processed("first@example.com")
+
+    def test_progress_tracker_multiline_email(self, tmp_path):
+        """Test that an email containing a newline is logged as one entry."""
+        progress_file = str(tmp_path / "emails.csv.progress")
+
+        tracker = ProgressTracker(progress_file)
+        tracker.mark_processed("a@example.com\nb@example.com")
+        tracker.save_progress()
+
+        resumed = ProgressTracker(progress_file)
+        assert resumed.processed_emails == {"a@example.com\nb@example.com"}
+        assert not resumed.is_processed("b@example.com")
+
+    def test_progress_tracker_compact_without_progress(self, tmp_path):
+        """Test that a run that processed nothing writes no progress file."""
+        progress_file = str(tmp_path / "missing.csv.progress")
+
+        ProgressTracker(progress_file).compact()
+
+        assert not os.path.exists(progress_file)
+
+    def test_derive_paths(self):
+        """Test that only the final extension is replaced in output paths."""
+        assert _derive_paths("exports.csv.d/out.csv") == (
+            "exports.csv.d/out_valid.csv", "exports.csv.d/out_invalid.csv", "exports.csv.d/out_results.csv"
+        )
+        assert _derive_paths("results")[2] == "results_results.csv"
+
     def test_write_results_empty_data(self):
         """Test write_results with empty data."""
         temp_dir = tempfile.mkdtemp()
@@ -274,6 +370,244 @@ class TestCSVProcessing:
         import shutil
         shutil.rmtree(temp_dir)
 
+    def test_validate_email_batch_groups_by_domain(self):
+        """Test that emails sharing a domain are validated in input order."""
+        batch = [
+            (1, {"email": "a@one.com"}),
+            (2, {"email": "b@two.com"}),
+            (3, {"email": "c@one.com"}),
+            (4, {"email": "d@one.com"}),
+        ]
+
+        validator = MagicMock()
+        validator.progress_tracker = None
+        validator.anti_spam_mode = False
+        validator.get_probe_delay.return_value = 0
+        validator.prefetch_mx_records = AsyncMock()
+        validated = []
+
+        def mock_verify(email):
+            validated.append(email)
+            return {
+                'valid': True,
+                'reason': 'Email verified successfully',
+                'format_valid': True,
+                'domain_exists': True,
+                'smtp_valid': True
+            }
+
+        validator.verify_many_async = AsyncMock(side_effect=lambda domain, emails: [
+            mock_verify(email) for email in emails
+        ])
+        csv_writer = MagicMock()
+
+        valid, invalid = asyncio.run(
+            validate_email_batch(validator, batch, csv_writer, ['email'])
+        )
+
+        assert (valid, invalid) == (4, 0)
+        assert csv_writer.write_result.call_count == 4
+        one_com = [email for email in validated if email.endswith('@one.com')]
+        assert one_com == ["a@one.com", "c@one.com", "d@one.com"]
+        assert validator.verify_many_async.call_count == 2  # one session per domain
+
+    @patch('email_validation.cli.EmailValidator.get_mx_record_async', new_callable=AsyncMock)
+    @patch('email_validation.cli.EmailValidator.get_mx_record')
+    def test_validate_email_batch_row_without_email(self, mock_get_mx, mock_get_mx_async):
+        """Test that a row with no email value is written as invalid, not fatal."""
+        mock_get_mx.return_value = mock_get_mx_async.return_value = "mail.example.com"
+        from email_validation.cli import EmailValidator
+        validator = EmailValidator(skip_smtp=True, anti_spam_mode=False)
+        batch = [
+            (1, {"email": None, "name": "Ragged"}),
+            (2, {"email": "a@example.com", "name": "Fine"}),
+        ]
+        csv_writer = MagicMock()
+        # The batch reuses one row dict, so copy each row as it is written
+        rows = []
+        csv_writer.write_result.side_effect = lambda result, fieldnames: rows.append(dict(result))
+
+        valid, invalid = asyncio.run(
+            validate_email_batch(validator, batch, csv_writer, ['email', 'name', 'email_original',
+                                                                'email_valid', 'validation_reason'])
+        )
+
+        assert (valid, invalid) == (1, 1)
+        written = {row['name']: row for row in rows}
+        assert written["Ragged"]['validation_reason'] == 'Invalid email format'
+        assert written["Ragged"]['email_original'] == ''
+
+    @patch('email_validation.cli.EmailValidator.get_mx_record_async', new_callable=AsyncMock)
+    def test_validate_email_batch_rows_with_different_keys(self, mock_get_mx_async):
+        """Test that a row missing a column does not inherit the previous row's value."""
+        mock_get_mx_async.return_value = "mail.example.com"
+        from email_validation.cli import EmailValidator
+        validator = EmailValidator(skip_smtp=True, anti_spam_mode=False)
+        batch = [
+            (1, {"email": "a@example.com", "name": "Alice", "company": "Acme"}),
+            (2, {"email": "b@example.com", "name": "Bob"}),
+        ]
+        csv_writer = MagicMock()
+        rows = []
+        csv_writer.write_result.side_effect = lambda result, fieldnames: rows.append(dict(result))
+
+        asyncio.run(validate_email_batch(validator, batch, csv_writer,
+                                         ['email', 'name', 'company', 'email_original']))
+
+        written = {row['name']: row for row in rows}
+        assert written["Alice"]['company'] == "Acme"
+        assert written["Bob"]['company'] == ''
+
+        # A row with surplus values adds no key to the shared scratch row
+        rows.clear()
+        asyncio.run(validate_email_batch(
+            validator, [(3, {"email": "c@example.com", "name": "Carol", "company": "", None: ["x"]})],
+            csv_writer, ['email', 'name', 'company', 'email_original']
+        ))
+        assert None not in rows[0]
+
+    @patch('email_validation.cli.EmailValidator.get_mx_record_async', new_callable=AsyncMock)
+    def test_evicted_duplicate_written_on_resumable_run(self, mock_get_mx_async, tmp_path):
+        """Test that a duplicate whose verdict left the result cache still gets its row."""
+        mock_get_mx_async.return_value = "mail.example.com"
+        from email_validation.cli import EmailValidator
+        tracker = ProgressTracker(str(tmp_path / "emails.csv.progress"))
+        validator = EmailValidator(skip_smtp=True, anti_spam_mode=False, progress_tracker=tracker)
+        validator.max_cached_results = 1
+        csv_writer = MagicMock()
+        fieldnames = ['email', 'email_original']
+
+        asyncio.run(validate_email_batch(
+            validator, [(1, {"email": "a@example.com"}), (2, {"email": "b@example.com"})],
+            csv_writer, fieldnames
+        ))
+        asyncio.run(validate_email_batch(validator, [(3, {"email": "a@example.com"})], csv_writer, fieldnames))
+
+        assert csv_writer.write_result.call_count == 3
+
+        # Emails finished by a previous run are still skipped
+        csv_writer.reset_mock()
+        tracker.compact()
+        resumed = EmailValidator(skip_smtp=True, anti_spam_mode=False,
+                                 progress_tracker=ProgressTracker(tracker.progress_file))
+        asyncio.run(validate_email_batch(resumed, [(1, {"email": "a@example.com"})], csv_writer, fieldnames))
+        csv_writer.write_result.assert_not_called()
+
+    def test_pending_batches_are_bounded(self, tmp_path):
+        """Test that at most MAX_PENDING_BATCHES batches are validated at once."""
+        from email_validation.cli import MAX_PENDING_BATCHES
+        input_file = tmp_path / "many.csv"
+        input_file.write_text("email\n" + "".join(f"user{i}\n" for i in range(12)), encoding="utf-8")
+        in_flight = 0
+        peak = 0
+
+        async def mock_validate_email_batch(validator, emails_batch, csv_writer, fieldnames):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return 0, len(emails_batch)
+
+        with patch('email_validation.cli.validate_email_batch', side_effect=mock_validate_email_batch) as mock_batch:
+            process_csv_file(str(input_file), str(tmp_path / "out.csv"), delay=0, max_workers=1,
+                             skip_smtp=True, anti_spam_mode=False, resume=False)
+
+        assert mock_batch.call_count == 12  # max_workers rows per batch
+        assert peak == MAX_PENDING_BATCHES
+
+    def test_interleave_by_domain(self):
+        """Test that rows are dispatched round-robin across domains."""
+        rows = [
+            {"email": "a1@a.com"}, {"email": "a2@a.com"}, {"email": "a3@a.com"},
+            {"email": "b1@B.com"}, {"email": "invalid-email"},
+        ]
+
+        ordered = _interleave_by_domain(rows)
+
+        assert [i for i, _ in ordered] == [1, 4, 5, 2, 3]
+        assert ordered[1][1] is rows[3]
+
+        # A row without an email value is kept rather than failing the window
+        ordered = _interleave_by_domain([{"email": None}, {"email": "a@a.com"}])
+        assert [i for i, _ in ordered] == [1, 2]
+
+    def test_iter_rows_matches_dict_reader(self):
+        """Test that rows come out exactly as csv.DictReader would build them."""
+        import io
+        data = "email,name\na@a.com,A\n\nb@b.com\nc@c.com,C,extra\n"
+
+        reader = csv.reader(io.StringIO(data))
+        rows = list(_iter_rows(reader, next(reader)))
+
+        assert rows == list(csv.DictReader(io.StringIO(data)))
+        assert rows[1] == {"email": "b@b.com", "name": None}
+
+        # Short rows where the email column itself is missing: DictReader
+        # fills it with None, and so must the zip-based reader
+        data = "name,email,company\nOnly Name\nBoth,d@d.com\n"
+        reader = csv.reader(io.StringIO(data))
+        rows = list(_iter_rows(reader, next(reader)))
+
+        assert rows == list(csv.DictReader(io.StringIO(data)))
+        assert rows[0] == {"name": "Only Name", "email": None, "company": None}
+        assert rows[1] == {"name": "Both", "email": "d@d.com", "company": None}
+
+
+    def test_process_csv_file_ragged_rows(self, tmp_path):
+        """Test that a short row missing its email is written, not fatal to the run."""
+        input_file = tmp_path / "ragged.csv"
+        input_file.write_text("name,email\nOnly Name\nBad,not-an-email\n", encoding="utf-8")
+        output_file = str(tmp_path / "out.csv")
+
+        process_csv_file(str(input_file), output_file, delay=0, max_workers=1,
+                         skip_smtp=True, anti_spam_mode=False, resume=False)
+
+        with open(output_file.replace('.csv', '_results.csv'), encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        assert sorted(row['name'] for row in rows) == ["Bad", "Only Name"]
+        assert {row['validation_reason'] for row in rows} == {'Invalid email format'}
+    def test_checkpoint_never_ahead_of_rows(self, tmp_path):
+        """Test that a checkpoint taken mid-batch only logs emails whose rows are written."""
+        from email_validation.cli import EmailValidator
+        input_file = tmp_path / "emails.csv"
+        emails = ["s1@slow.com", "s2@slow.com"] + [f"a{i}@fast.com" for i in range(10)]
+        input_file.write_text("email\n" + "".join(f"{email}\n" for email in emails), encoding="utf-8")
+        output_file = str(tmp_path / "out.csv")
+        results_file = output_file.replace('.csv', '_results.csv')
+
+        precheck = EmailValidator._precheck_async
+        save_progress = ProgressTracker.save_progress
+        checkpoints = []
+
+        async def slow_precheck(self, email, result, domain):
+            # The first batch is [s1, a0, s2]: it stalls mid-group after s1
+            if email == "s2@slow.com":
+                await asyncio.sleep(0.1)
+            return await precheck(self, email, result, domain)
+
+        # Checked after the run: the pipeline logs and swallows errors raised inside it
+        def checked_save(self):
+            save_progress(self)
+            if os.path.exists(self.log_file):
+                with open(self.log_file, encoding='utf-8') as f:
+                    logged = {json.loads(line) for line in f}
+                with open(results_file, encoding='utf-8') as f:
+                    written = {row['email'] for row in csv.DictReader(f)}
+                checkpoints.append((logged, written))
+
+        with patch.object(EmailValidator, '_precheck_async', slow_precheck), \
+                patch.object(ProgressTracker, 'save_progress', checked_save), \
+                patch('email_validation.cli.EmailValidator.get_mx_record_async',
+                      new_callable=AsyncMock, return_value="mail.example.com"):
+            process_csv_file(str(input_file), output_file, delay=0, max_workers=3,
+                             skip_smtp=True, anti_spam_mode=False, resume=True)
+
+        # At least one checkpoint fell while the slow group was still running
+        assert any("s2@slow.com" not in logged for logged, _ in checkpoints)
+        for logged, written in checkpoints:
+            assert logged <= written
+
 
 @pytest.mark.integration
 class TestCSVProcessingIntegration:
@@ -325,4 +659,4 @@ class TestCSVProcessingIntegration:
         
         # Cleanup
         import shutil
-        shutil.rmtree(temp_dir)
\ No newline at end of file
+        shutil.rmtree(temp_dir)
@@ -1,12 +1,21 @@
 """Unit tests for EmailValidator class."""
 
 import pytest
-from unittest.mock import patch, MagicMock
+import asyncio
+from unittest.mock import patch, MagicMock, AsyncMock
 import smtplib
 import socket
+import os
+import time
 import dns.resolver
+import dns.exception
+import aiosmtplib
+from types import SimpleNamespace
 
-from email_validation.cli import EmailValidator
+from email_validation.cli import (
+    EmailValidator, MXCache, ValidationResult, MX_NEGATIVE_TTL, build_resolver,
+    DNS_TIMEOUT, DNS_LIFETIME, FALLBACK_NAMESERVERS,
+)
 
 
 class TestEmailValidator:
@@ -56,42 +65,42 @@ class TestEmailValidator:
             "",
             "user@.com",
             "user@domain.",
-            "user@domain..com"
+            "user@domain..com",
+            "user@domain.com\n",
+            "user@domain.com\r\n",
         ]
 
         for email in invalid_emails:
             assert not self.validator.is_valid_format(email), f"Email {email} should be invalid"
 
+    def test_is_valid_format_too_long(self):
+        """Test that addresses longer than an SMTP path are rejected."""
+        domain = "@example.com"
+        assert self.validator.is_valid_format("a" * (254 - len(domain)) + domain)
+        assert not self.validator.is_valid_format("a" * (255 - len(domain)) + domain)
+
     # MX record tests
-    @patch('dns.resolver.resolve')
+    @patch('dns.resolver.Resolver.resolve')
     def test_get_mx_record_success(self, mock_resolve):
         """Test successful MX record lookup."""
-        mock_mx = MagicMock()
-        mock_mx.preference = 10
-        mock_mx.exchange = "mail.example.com."
+        mock_mx = SimpleNamespace(preference=10, exchange="mail.example.com.")
         mock_resolve.return_value = [mock_mx]
 
         result = self.validator.get_mx_record("example.com")
         assert result == "mail.example.com"
         mock_resolve.assert_called_once_with("example.com", 'MX')
 
-    @patch('dns.resolver.resolve')
+    @patch('dns.resolver.Resolver.resolve')
     def test_get_mx_record_multiple_records(self, mock_resolve):
         """Test MX record lookup with multiple records."""
-        mock_mx1 = MagicMock()
-        mock_mx1.preference = 20
-        mock_mx1.exchange = "mail2.example.com."
-
-        mock_mx2 = MagicMock()
-        mock_mx2.preference = 10
-        mock_mx2.exchange = "mail1.example.com."
-
+        mock_mx1 = SimpleNamespace(preference=20, exchange="mail2.example.com.")
+        mock_mx2 = SimpleNamespace(preference=10, exchange="mail1.example.com.")
         mock_resolve.return_value = [mock_mx1, mock_mx2]
 
         result = self.validator.get_mx_record("example.com")
         assert result == "mail1.example.com"  # Should return highest priority (lowest number)
 
-    @patch('dns.resolver.resolve')
+    @patch('dns.resolver.Resolver.resolve')
     def test_get_mx_record_failure(self, mock_resolve):
         """Test MX record lookup failure."""
         mock_resolve.side_effect = dns.resolver.NXDOMAIN()
@@ -99,6 +108,113 @@ class TestEmailValidator:
         result = self.validator.get_mx_record("nonexistent.domain")
         assert result is None
 
+    @patch('dns.resolver.Resolver.resolve')
+    def test_get_mx_record_cached(self, mock_resolve):
+        """Test that repeated lookups of a domain hit the MX cache."""
+        mock_mx = SimpleNamespace(preference=10, exchange="mail.example.com.")
+        mock_resolve.return_value = [mock_mx]
+
+        assert self.validator.get_mx_record("example.com") == "mail.example.com"
+        assert self.validator.get_mx_record("example.com") == "mail.example.com"
+        mock_resolve.assert_called_once()
+
+    @patch('dns.resolver.Resolver.resolve')
+    def test_get_mx_record_nxdomain_cached(self, mock_resolve):
+        """Test that a nonexistent domain is only looked up once."""
+        mock_resolve.side_effect = dns.resolver.NXDOMAIN()
+
+        assert self.validator.get_mx_record("nonexistent.domain") is None
+        assert self.validator.get_mx_record("nonexistent.domain") is None
+        mock_resolve.assert_called_once()
+
+    @patch('email_validation.cli.time.monotonic')
+    @patch('dns.resolver.Resolver.resolve')
+    def test_get_mx_record_timeout_cached_briefly(self, mock_resolve, mock_monotonic):
+        """Test that a lookup timeout is retried once the short negative TTL passes."""
+        mock_monotonic.return_value = 1000.0
+        mock_resolve.side_effect = dns.exception.Timeout()
+
+        assert self.validator.get_mx_record("slow.example") is None
+        assert self.validator.get_mx_record("slow.example") is None
+        assert mock_resolve.call_count == 1
+
+        mock_monotonic.return_value = 1000.0 + MX_NEGATIVE_TTL + 1
+        assert self.validator.get_mx_record("slow.example") is None
+        assert mock_resolve.call_count == 2
+
+    def test_build_resolver(self):
+        """Test resolver timeouts, pinned nameservers and the no-config fallback."""
+        resolver = build_resolver(nameservers=['9.9.9.9'])
+        assert resolver.nameservers == ['9.9.9.9']
+        assert resolver.timeout == DNS_TIMEOUT
+        assert resolver.lifetime == DNS_LIFETIME
+
+        with patch('dns.resolver.Resolver.read_resolv_conf',
+                   side_effect=dns.resolver.NoResolverConfiguration()):
+            resolver = build_resolver()
+        assert resolver.nameservers == FALLBACK_NAMESERVERS
+
+    def test_mx_cache_expiry_and_eviction(self):
+        """Test that the MX cache drops expired and least recently used entries."""
+        cache = MXCache(maxsize=2)
+        cache.set("expired.com", "mx.expired.com", 0)
+        assert cache.get("expired.com") == (False, None)
+
+        cache.set("a.com", "mx.a.com", 60)
+        cache.set("b.com", None, 60)
+        assert cache.get("b.com") == (True, None)  # negative entries are hits
+
+        cache.get("a.com")
+        cache.set("c.com", "mx.c.com", 60)
+        assert cache.get("b.com") == (False, None)
+        assert cache.get("a.com") == (True, "mx.a.com")
+        assert len(cache) == 2
+
+    def test_mx_cache_persistence(self, temp_dir):
+        """Test that unexpired MX cache entries survive a save and load."""
+        path = os.path.join(temp_dir, "emails.csv.mxcache.json")
+        cache = MXCache()
+        cache.set("example.com", "mail.example.com", 60)
+        cache.set("nxdomain.com", None, 60)
+        cache.set("expired.com", "mx.expired.com", -1)
+        cache.save(path)
+
+        restored = MXCache()
+        restored.load(path)
+
+        assert restored.get("example.com") == (True, "mail.example.com")
+        assert restored.get("nxdomain.com") == (True, None)
+        assert restored.get("expired.com") == (False, None)
+
+    def test_mx_cache_load_malformed(self, temp_dir):
+        """Test that a cache file of the wrong shape is ignored, not raised."""
+        path = os.path.join(temp_dir, "emails.csv.mxcache.json")
+        for content in ('{"example.com": "mail.example.com"}', '["example.com"]'):
+            with open(path, 'w') as f:
+                f.write(content)
+            cache = MXCache()
+            cache.load(path)
+            assert len(cache) == 0
+
+    @patch('dns.resolver.Resolver.resolve')
+    @patch('dns.asyncresolver.Resolver')
+    def test_prefetch_mx_records(self, mock_resolver_class, mock_resolve):
+        """Test that prefetching warms the MX cache for later lookups."""
+        mock_mx = SimpleNamespace(preference=10, exchange="mail.example.com.")
+
+        async def fake_resolve(domain, rdtype):
+            if domain == "example.com":
+                return [mock_mx]
+            raise dns.resolver.NXDOMAIN()
+
+        mock_resolver_class.return_value.resolve = AsyncMock(side_effect=fake_resolve)
+
+        asyncio.run(self.validator.prefetch_mx_records(["example.com", "missing.com"]))
+
+        assert self.validator.get_mx_record("example.com") == "mail.example.com"
+        assert self.validator.get_mx_record("missing.com") is None
+        mock_resolve.assert_not_called()
+
     # SMTP verification tests
     @patch('email_validation.cli.EmailValidator.get_mx_record')
     @patch('smtplib.SMTP')
@@ -154,6 +270,43 @@ class TestEmailValidator:
         assert result['smtp_valid'] is False
         assert result['reason'] == "No MX record found"
 
+    @patch('email_validation.cli.EmailValidator.get_mx_record')
+    @patch('smtplib.SMTP')
+    def test_verify_email_smtp_format_only_domain(self, mock_smtp_class, mock_get_mx):
+        """Test that providers in the format-only set are never probed."""
+        mock_get_mx.return_value = "gmail-smtp-in.l.google.com"
+
+        result = self.validator.verify_email_smtp("someone@gmail.com")
+
+        assert result['valid'] is True
+        assert result['domain_exists'] is True
+        assert result['smtp_valid'] is False
+        assert "SMTP skipped" in result['reason']
+        mock_smtp_class.assert_not_called()
+
+        # An empty set restores probing for every domain
+        validator = EmailValidator(anti_spam_mode=False, format_only_domains=())
+        mock_smtp_class.return_value.rcpt.return_value = (250, "OK")
+        assert validator.verify_email_smtp("someone@gmail.com")['smtp_valid'] is True
+
+    @patch('email_validation.cli.EmailValidator.get_mx_record')
+    @patch('smtplib.SMTP')
+    def test_unprobed_emails_do_not_use_rate_limit(self, mock_smtp_class, mock_get_mx):
+        """Test that emails settled without SMTP never count against the hourly limit."""
+        mock_get_mx.return_value = "gmail-smtp-in.l.google.com"
+        validator = EmailValidator(anti_spam_mode=True)
+        count = validator.max_requests_per_hour + 50
+
+        results = [validator.verify_email_smtp(f"user{i}@gmail.com") for i in range(count)]
+
+        assert all(r['valid'] for r in results)
+        assert {r['reason'] for r in results} == {'Format and domain valid (SMTP skipped for provider)'}
+        assert not validator.requests_per_domain["gmail.com"]
+        mock_smtp_class.assert_not_called()
+
+        skip_smtp = EmailValidator(anti_spam_mode=True, skip_smtp=True)
+        assert all(skip_smtp.verify_email_smtp(f"user{i}@example.com")['valid'] for i in range(count))
+
     @patch('email_validation.cli.EmailValidator.get_mx_record')
     @patch('smtplib.SMTP')
     def test_verify_email_smtp_rejected(self, mock_smtp_class, mock_get_mx):
@@ -173,68 +326,459 @@ class TestEmailValidator:
         assert result['smtp_valid'] is False
         assert "SMTP rejected: 550" in result['reason']
 
+    @pytest.mark.parametrize("side_effect, expected_reason", [
+        (smtplib.SMTPRecipientsRefused({}), "SMTP error: SMTPRecipientsRefused"),
+        (smtplib.SMTPServerDisconnected(), "SMTP error: SMTPServerDisconnected"),
+        # socket.timeout is an alias of TimeoutError
+        (socket.timeout(), "SMTP error: TimeoutError"),
+        (Exception("Network error"), "SMTP error: Network error"),
+    ])
     @patch('email_validation.cli.EmailValidator.get_mx_record')
     @patch('smtplib.SMTP')
-    def test_verify_email_smtp_recipients_refused(self, mock_smtp_class, mock_get_mx):
-        """Test SMTP verification with recipients refused."""
+    def test_verify_email_smtp_errors(self, mock_smtp_class, mock_get_mx, side_effect, expected_reason):
+        """Test SMTP verification when the RCPT command raises."""
         mock_get_mx.return_value = "mail.example.com"
 
         mock_smtp = MagicMock()
-        mock_smtp.rcpt.side_effect = smtplib.SMTPRecipientsRefused({})
+        mock_smtp.rcpt.side_effect = side_effect
         mock_smtp_class.return_value = mock_smtp
 
-        result = self.validator.verify_email_smtp("refused@example.com")
+        result = self.validator.verify_email_smtp("test@example.com")
 
         assert result['valid'] is False
-        # Updated to match actual error format
-        assert result['reason'] == "SMTP error: SMTPRecipientsRefused"
+        assert result['domain_exists'] is True
+        assert result['smtp_valid'] is False
+        assert result['reason'] == expected_reason
+        mock_smtp.quit.assert_not_called()
+        mock_smtp.close.assert_called_once()
 
     @patch('email_validation.cli.EmailValidator.get_mx_record')
     @patch('smtplib.SMTP')
-    def test_verify_email_smtp_server_disconnected(self, mock_smtp_class, mock_get_mx):
-        """Test SMTP verification with server disconnection."""
+    def test_verify_email_smtp_quit_failure_keeps_verdict(self, mock_smtp_class, mock_get_mx):
+        """Test that a QUIT failing after the RCPT reply does not discard it."""
         mock_get_mx.return_value = "mail.example.com"
 
         mock_smtp = MagicMock()
-        mock_smtp.rcpt.side_effect = smtplib.SMTPServerDisconnected()
+        mock_smtp.rcpt.return_value = (250, "OK")
+        mock_smtp.quit.side_effect = smtplib.SMTPServerDisconnected()
         mock_smtp_class.return_value = mock_smtp
 
         result = self.validator.verify_email_smtp("test@example.com")
 
-        assert result['valid'] is False
-        # Updated to match actual error format
-        assert result['reason'] == "SMTP error: SMTPServerDisconnected"
+        assert result['valid'] is True
+        assert result['reason'] == "Email verified successfully"
+        mock_smtp.close.assert_called_once()
 
     @patch('email_validation.cli.EmailValidator.get_mx_record')
     @patch('smtplib.SMTP')
-    def test_verify_email_smtp_timeout(self, mock_smtp_class, mock_get_mx):
-        """Test SMTP verification with timeout."""
+    def test_verify_email_smtp_duplicate_reuses_verdict(self, mock_smtp_class, mock_get_mx):
+        """Test that a repeated email gets the first verdict without a new probe."""
+        mock_get_mx.return_value = "mail.example.com"
+        mock_smtp_class.return_value.rcpt.return_value = (250, "OK")
+
+        first = self.validator.verify_email_smtp("test@example.com")
+        second = self.validator.verify_email_smtp("test@example.com")
+
+        assert second == first
+        assert second['valid'] is True
+        mock_smtp_class.assert_called_once()
+
+    @patch('email_validation.cli.EmailValidator.get_mx_record')
+    @patch('smtplib.SMTP')
+    def test_result_cache_is_bounded(self, mock_smtp_class, mock_get_mx):
+        """Test that the least recently seen verdict is evicted first."""
+        mock_get_mx.return_value = "mail.example.com"
+        mock_smtp_class.return_value.rcpt.return_value = (250, "OK")
+        self.validator.max_cached_results = 2
+
+        for email in ("a@example.com", "b@example.com", "a@example.com", "c@example.com"):
+            self.validator.verify_email_smtp(email)
+
+        assert list(self.validator.result_cache) == ["a@example.com", "c@example.com"]
+        assert mock_smtp_class.call_count == 3
+
+    @patch('email_validation.cli.time.sleep')
+    @patch('email_validation.cli.EmailValidator.get_mx_record')
+    @patch('smtplib.SMTP')
+    def test_verify_many_reuses_connection(self, mock_smtp_class, mock_get_mx, mock_sleep):
+        """Test that emails of one domain share a single SMTP session."""
         mock_get_mx.return_value = "mail.example.com"
 
         mock_smtp = MagicMock()
-        mock_smtp.rcpt.side_effect = socket.timeout()
+        mock_smtp.ehlo.return_value = (250, b"mail.example.com")
+        mock_smtp.has_extn.return_value = False
+        mock_smtp.rcpt.side_effect = [(250, "OK"), (550, "User unknown")]
         mock_smtp_class.return_value = mock_smtp
 
-        result = self.validator.verify_email_smtp("test@example.com")
+        results = self.validator.verify_many(
+            "example.com", ["good@example.com", "bad@example.com"]
+        )
 
-        assert result['valid'] is False
-        # Updated to match actual error format (socket.timeout becomes TimeoutError)
-        assert result['reason'] == "SMTP error: TimeoutError"
+        assert [r['valid'] for r in results] == [True, False]
+        assert "SMTP rejected: 550" in results[1]['reason']
+        mock_smtp_class.assert_called_once()
+        mock_smtp.connect.assert_called_once_with("mail.example.com", 25)
+        mock_smtp.ehlo.assert_called_once_with('gmail.com')
+        assert mock_smtp.rcpt.call_count == 2
+        assert mock_smtp.rset.call_count == 2
+        mock_smtp.quit.assert_called_once()
+        mock_sleep.assert_called_once()
 
+    @patch('email_validation.cli.time.sleep')
     @patch('email_validation.cli.EmailValidator.get_mx_record')
     @patch('smtplib.SMTP')
-    def test_verify_email_smtp_general_exception(self, mock_smtp_class, mock_get_mx):
-        """Test SMTP verification with general exception."""
+    def test_verify_many_recycles_session_after_deferral(self, mock_smtp_class, mock_get_mx, mock_sleep):
+        """Test that a 4xx reply ends the session before the next address."""
         mock_get_mx.return_value = "mail.example.com"
 
         mock_smtp = MagicMock()
-        mock_smtp.rcpt.side_effect = Exception("Network error")
+        mock_smtp.ehlo.return_value = (250, b"mail.example.com")
+        mock_smtp.has_extn.return_value = False
+        mock_smtp.rcpt.side_effect = [(452, "Too many recipients"), (250, "OK")]
         mock_smtp_class.return_value = mock_smtp
 
-        result = self.validator.verify_email_smtp("test@example.com")
+        results = self.validator.verify_many(
+            "example.com", ["first@example.com", "second@example.com"]
+        )
+
+        assert [r['valid'] for r in results] == [False, True]
+        assert mock_smtp.connect.call_count == 2
+        assert mock_smtp.quit.call_count == 2
+
+    @patch('email_validation.cli.time.sleep')
+    @patch('email_validation.cli.EmailValidator.get_mx_record')
+    @patch('smtplib.SMTP')
+    def test_verify_many_malformed_emails_not_paced(self, mock_smtp_class, mock_get_mx, mock_sleep):
+        """Test that only real SMTP probes wait for the probe delay."""
+        mock_get_mx.return_value = "mail.example.com"
+        mock_smtp = MagicMock()
+        mock_smtp.ehlo.return_value = (250, b"mail.example.com")
+        mock_smtp.has_extn.return_value = False
+        mock_smtp.rcpt.return_value = (250, "OK")
+        mock_smtp_class.return_value = mock_smtp
+
+        results = self.validator.verify_many(
+            "example.com", ["bad@@example.com", "good@example.com"]
+        )
+
+        assert results[0]['reason'] == 'Invalid email format'
+        assert results[1]['valid'] is True
+        mock_sleep.assert_not_called()
+
+    @patch('email_validation.cli.time.sleep')
+    @patch('email_validation.cli.EmailValidator.get_mx_record')
+    @patch('smtplib.SMTP')
+    def test_probe_pacing_is_per_domain(self, mock_smtp_class, mock_get_mx, mock_sleep):
+        """Test that a probe only waits for its own domain's previous probe."""
+        mock_get_mx.return_value = "mail.example.com"
+        mock_smtp = MagicMock()
+        mock_smtp.ehlo.return_value = (250, b"mail.example.com")
+        mock_smtp.has_extn.return_value = False
+        mock_smtp.rcpt.return_value = (250, "OK")
+        mock_smtp_class.return_value = mock_smtp
+
+        self.validator.verify_many("one.com", ["a@one.com"])
+        self.validator.verify_many("two.com", ["b@two.com"])
+        mock_sleep.assert_not_called()
+
+        self.validator.verify_many("one.com", ["c@one.com"])
+        mock_sleep.assert_called_once()
+        assert 0 < mock_sleep.call_args[0][0] <= 0.1
+
+    @patch('email_validation.cli.time.sleep')
+    @patch('email_validation.cli.EmailValidator.get_mx_record')
+    @patch('smtplib.SMTP')
+    def test_verify_many_reconnects_after_disconnect(self, mock_smtp_class, mock_get_mx, mock_sleep):
+        """Test that a dropped session is reopened and the address retried."""
+        mock_get_mx.return_value = "mail.example.com"
+
+        dropped = MagicMock()
+        dropped.ehlo.return_value = (250, b"mail.example.com")
+        dropped.has_extn.return_value = False
+        dropped.rcpt.side_effect = smtplib.SMTPServerDisconnected()
+        fresh = MagicMock()
+        fresh.ehlo.return_value = (250, b"mail.example.com")
+        fresh.has_extn.return_value = False
+        fresh.rcpt.return_value = (250, "OK")
+        mock_smtp_class.side_effect = [dropped, fresh]
+
+        results = self.validator.verify_many("example.com", ["test@example.com"])
+
+        assert results[0]['valid'] is True
+        assert mock_smtp_class.call_count == 2
+        fresh.rcpt.assert_called_once_with("test@example.com")
+
+    @patch('email_validation.cli.EmailValidator.get_mx_record')
+    @patch('smtplib.SMTP')
+    def test_verify_many_pipelining(self, mock_smtp_class, mock_get_mx):
+        """Test that MAIL/RCPT/RSET go out in one write when PIPELINING is offered."""
+        mock_get_mx.return_value = "mail.example.com"
+
+        mock_smtp = MagicMock()
+        mock_smtp.ehlo.return_value = (250, b"mail.example.com")
+        mock_smtp.has_extn.side_effect = lambda name: name == 'pipelining'
+        mock_smtp.getreply.side_effect = [(250, b"OK"), (550, b"User unknown"), (250, b"OK")]
+        mock_smtp_class.return_value = mock_smtp
+
+        results = self.validator.verify_many("example.com", ["bad@example.com"])
+
+        mock_smtp.send.assert_called_once_with(
+            b"MAIL FROM:<test@gmail.com>\r\nRCPT TO:<bad@example.com>\r\nRSET\r\n"
+        )
+        mock_smtp.mail.assert_not_called()
+        mock_smtp.rcpt.assert_not_called()
+        assert results[0]['valid'] is False
+        assert "SMTP rejected: 550" in results[0]['reason']
+
+    def test_pipelined_envelope_rejects_line_breaks(self):
+        """Test that an address with a line break is never written to a pipelined session."""
+        mock_smtp = MagicMock()
+        mock_smtp.has_extn.side_effect = lambda name: name == 'pipelining'
+
+        with pytest.raises(ValueError):
+            self.validator._rcpt(mock_smtp, "test@gmail.com", "a@example.com\n")
+        mock_smtp.send.assert_not_called()
+
+        mock_client = MagicMock()
+        mock_client.supports_extension.return_value = True
+        with pytest.raises(ValueError):
+            asyncio.run(self.validator._rcpt_async(mock_client, "test@gmail.com", "a@example.com\r\nDATA"))
+        mock_client.protocol.write.assert_not_called()
+
+    @patch('socket.getaddrinfo', return_value=[])
+    @patch('email_validation.cli.EmailValidator.get_mx_record_async', new_callable=AsyncMock)
+    @patch('email_validation.cli.EmailValidator.get_mx_record')
+    @patch('aiosmtplib.SMTP')
+    def test_verify_many_async(self, mock_smtp_class, mock_get_mx, mock_get_mx_async, mock_getaddrinfo):
+        """Test async verification over one aiosmtplib session."""
+        mock_get_mx_async.return_value = "mail.example.com"
+
+        mock_smtp = MagicMock()
+        for method in ('connect', 'ehlo', 'mail', 'rset', 'quit'):
+            setattr(mock_smtp, method, AsyncMock())
+        mock_smtp.supports_extension.return_value = False
+        mock_smtp.rcpt = AsyncMock(side_effect=[
+            SimpleNamespace(code=250, message="OK"),
+            aiosmtplib.SMTPRecipientRefused(550, "User unknown", "bad@example.com"),
+        ])
+        mock_smtp_class.return_value = mock_smtp
+
+        validator = EmailValidator(delay=0, anti_spam_mode=False)
+        results = asyncio.run(validator.verify_many_async(
+            "example.com", ["good@example.com", "bad@example.com"]
+        ))
+
+        assert [r['valid'] for r in results] == [True, False]
+        assert results[1]['reason'] == "SMTP rejected: 550 User unknown"
+        mock_smtp_class.assert_called_once()
+        mock_smtp.connect.assert_awaited_once()
+        mock_smtp.ehlo.assert_awaited_once_with('gmail.com')
+        mock_smtp.quit.assert_awaited_once()
+        # The MX lookup stays on the event loop
+        mock_get_mx.assert_not_called()
+
+    @patch('socket.getaddrinfo', return_value=[])
+    @patch('aiosmtplib.SMTP')
+    def test_open_smtp_async_closes_on_helo_error(self, mock_smtp_class, mock_getaddrinfo):
+        """Test that a client whose EHLO and HELO both fail is closed, not leaked."""
+        mock_smtp = MagicMock()
+        mock_smtp.connect = AsyncMock()
+        mock_smtp.ehlo = AsyncMock(side_effect=aiosmtplib.SMTPHeloError(501, "bad"))
+        mock_smtp.helo = AsyncMock(side_effect=aiosmtplib.SMTPServerDisconnected("gone"))
+        mock_smtp_class.return_value = mock_smtp
+
+        with pytest.raises(aiosmtplib.SMTPServerDisconnected):
+            asyncio.run(self.validator._open_smtp_async("mail.example.com", "gmail.com"))
+
+        mock_smtp.close.assert_called_once()
+
+    @patch('socket.getaddrinfo', return_value=[])
+    @patch('email_validation.cli.EmailValidator.get_mx_record_async', new_callable=AsyncMock)
+    @patch('email_validation.cli.EmailValidator.get_mx_record')
+    @patch('aiosmtplib.SMTP')
+    def test_probe_spacing_survives_semaphore_wait(self, mock_smtp_class, mock_get_mx,
+                                                   mock_get_mx_async, mock_getaddrinfo):
+        """Test that a session queued behind a semaphore still spaces its probes."""
+        mock_get_mx.return_value = mock_get_mx_async.return_value = "mail.example.com"
+        loop_time = time.monotonic
+        probe_times = []
+
+        async def rcpt(email):
+            probe_times.append(loop_time())
+            if len(probe_times) == 1:
+                await asyncio.sleep(0.15)  # the first session holds the only slot
+            return SimpleNamespace(code=250, message="OK")
+
+        def new_client(**kwargs):
+            client = MagicMock()
+            for method in ('connect', 'ehlo', 'mail', 'rset', 'quit'):
+                setattr(client, method, AsyncMock())
+            client.supports_extension.return_value = False
+            client.rcpt = AsyncMock(side_effect=rcpt)
+            return client
+        mock_smtp_class.side_effect = new_client
+
+        validator = EmailValidator(delay=0.1, max_workers=1, anti_spam_mode=False)
+
+        async def run():
+            await asyncio.gather(
+                validator.verify_many_async("example.com", ["a1@example.com"]),
+                validator.verify_many_async("example.com", ["b1@example.com", "b2@example.com"]),
+            )
+        asyncio.run(run())
+
+        assert len(probe_times) == 3
+        gaps = [later - earlier for earlier, later in zip(probe_times, probe_times[1:])]
+        assert min(gaps) >= 0.09
+
+    @patch('socket.getaddrinfo', return_value=[])
+    @patch('email_validation.cli.EmailValidator.get_mx_record_async', new_callable=AsyncMock)
+    @patch('email_validation.cli.EmailValidator.get_mx_record')
+    @patch('aiosmtplib.SMTP')
+    def test_session_cap_across_domains(self, mock_smtp_class, mock_get_mx,
+                                        mock_get_mx_async, mock_getaddrinfo):
+        """Test that concurrent domains never hold more than max_workers sessions."""
+        mock_get_mx.side_effect = lambda domain: f"mx.{domain}"
+        mock_get_mx_async.side_effect = lambda domain: f"mx.{domain}"
+        open_sessions = 0
+        peak = 0
+
+        async def connect():
+            nonlocal open_sessions, peak
+            open_sessions += 1
+            peak = max(peak, open_sessions)
+
+        async def quit():
+            nonlocal open_sessions
+            open_sessions -= 1
+
+        async def rcpt(email):
+            await asyncio.sleep(0.01)
+            return SimpleNamespace(code=250, message="OK")
+
+        def new_client(**kwargs):
+            client = MagicMock()
+            for method in ('ehlo', 'mail', 'rset'):
+                setattr(client, method, AsyncMock())
+            client.connect = AsyncMock(side_effect=connect)
+            client.quit = AsyncMock(side_effect=quit)
+            client.rcpt = AsyncMock(side_effect=rcpt)
+            client.supports_extension.return_value = False
+            return client
+        mock_smtp_class.side_effect = new_client
+
+        validator = EmailValidator(delay=0, max_workers=2, anti_spam_mode=False)
+
+        async def run():
+            return await asyncio.gather(*(
+                validator.verify_many_async(f"d{i}.com", [f"a@d{i}.com", f"b@d{i}.com"])
+                for i in range(6)
+            ))
+        results = asyncio.run(run())
+
+        assert all(r['valid'] for group in results for r in group)
+        assert peak == 2
+        assert open_sessions == 0
+        # Semaphores of MX hosts with no session left are forgotten
+        assert not validator._mx_semaphores
+
+    def test_prune_domain_state(self):
+        """Test that expired per-domain and per-MX entries are dropped, live ones kept."""
+        from email_validation.cli import RATE_LIMIT_WINDOW
+        validator = self.validator
+        now = time.monotonic()
+        validator._next_probe_at.update({"idle.com": now - 1, "busy.com": now + 5})
+        validator._unreachable_mx.update({"mx.old.com": now - 1, "mx.down.com": now + 30})
+        validator._mx_addresses.update({"mx.old.com": ("192.0.2.1", now - 1),
+                                        "mx.live.com": ("192.0.2.2", now + 30)})
+        validator.requests_per_domain["idle.com"].append(now - RATE_LIMIT_WINDOW - 1)
+        validator.requests_per_domain["busy.com"].append(now)
+
+        # Sweeps are spaced out
+        validator._prune_domain_state()
+        assert "idle.com" in validator._next_probe_at
+
+        validator._next_prune_at = 0
+        validator._prune_domain_state()
+
+        assert set(validator._next_probe_at) == {"busy.com"}
+        assert set(validator._unreachable_mx) == {"mx.down.com"}
+        assert set(validator._mx_addresses) == {"mx.live.com"}
+        assert set(validator.requests_per_domain) == {"busy.com"}
+
+    @patch('socket.getaddrinfo', return_value=[])
+    @patch('email_validation.cli.EmailValidator.get_mx_record_async', new_callable=AsyncMock)
+    @patch('aiosmtplib.SMTP')
+    def test_verify_email_smtp_async_timeout(self, mock_smtp_class, mock_get_mx_async, mock_getaddrinfo):
+        """Test async verification when the connection times out."""
+        mock_get_mx_async.return_value = "mail.example.com"
+
+        mock_smtp = MagicMock()
+        mock_smtp.connect = AsyncMock(side_effect=aiosmtplib.SMTPConnectTimeoutError("timed out"))
+        mock_smtp_class.return_value = mock_smtp
+
+        result = asyncio.run(self.validator.verify_email_smtp_async("test@example.com"))
 
         assert result['valid'] is False
-        assert "SMTP error: Network error" in result['reason']
+        assert result['domain_exists'] is True
+        assert result['reason'] == "SMTP error: SMTPConnectTimeoutError"
+
+    @patch('socket.getaddrinfo')
+    def test_mx_address_resolved_once(self, mock_getaddrinfo):
+        """Test that async sessions reuse the MX host address, preferring IPv4."""
+        mock_getaddrinfo.return_value = [
+            (socket.AF_INET6, socket.SOCK_STREAM, 6, '', ('2001:db8::1', 25, 0, 0)),
+            (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('192.0.2.1', 25)),
+        ]
+
+        async def resolve_twice():
+            return [await self.validator._mx_address_async("mail.example.com") for _ in range(2)]
+
+        assert asyncio.run(resolve_twice()) == ['192.0.2.1', '192.0.2.1']
+        mock_getaddrinfo.assert_called_once()
+
+        # A failed lookup leaves the host name to the connect and is not cached
+        mock_getaddrinfo.side_effect = socket.gaierror()
+        assert asyncio.run(self.validator._mx_address_async("mx.other.com")) == "mx.other.com"
+        assert "mx.other.com" not in self.validator._mx_addresses
+
+    @patch('email_validation.cli.EmailValidator.get_mx_record')
+    @patch('smtplib.SMTP')
+    def test_unreachable_mx_host_skipped(self, mock_smtp_class, mock_get_mx):
+        """Test that a host that failed to connect is not dialed again for a while."""
+        mock_get_mx.return_value = "mail.example.com"
+
+        mock_smtp = MagicMock()
+        mock_smtp.connect.side_effect = socket.timeout()
+        mock_smtp_class.return_value = mock_smtp
+
+        first = self.validator.verify_email_smtp("a@example.com")
+        second = self.validator.verify_email_smtp("b@example.com")
+
+        assert first['reason'] == "SMTP error: TimeoutError"
+        assert second['valid'] is False
+        assert second['domain_exists'] is True
+        assert second['reason'] == "SMTP error: MX host unreachable"
+        mock_smtp.connect.assert_called_once()
+
+        # Once the window has passed the host is tried again
+        self.validator._unreachable_mx["mail.example.com"] = 0
+        self.validator.verify_email_smtp("c@example.com")
+        assert mock_smtp.connect.call_count == 2
+
+    def test_validation_result_access(self, invalid_format_result):
+        """Test attribute and dict-style access on ValidationResult."""
+        result = ValidationResult('invalid-email', reason='Invalid email format')
+
+        assert result == invalid_format_result
+        assert result['reason'] == result.reason == 'Invalid email format'
+        assert dict(result) == invalid_format_result
+        assert not hasattr(result, '__dict__')
+
+        result['valid'] = True
+        assert result.valid is True
+        with pytest.raises(KeyError):
+            result['unknown']
 
     def test_anti_spam_mode_randomization(self):
         """Test that anti-spam mode uses random values."""
@@ -252,13 +796,50 @@ class TestEmailValidator:
         # Test rate limit check
         domain = "example.com"
 
-        # Should allow requests initially
+        # Should allow requests up to the hourly limit
+        for _ in range(validator.max_requests_per_hour):
+            assert validator._check_rate_limit(domain) is True
+
+        # Should block further requests
+        assert validator._check_rate_limit(domain) is False
+
+        # Other domains have their own budget
+        assert validator._check_rate_limit("other.com") is True
+
+    @patch('email_validation.cli.time.time')
+    @patch('email_validation.cli.time.monotonic')
+    def test_rate_limit_window_uses_monotonic_clock(self, mock_monotonic, mock_time):
+        """Test that the hourly window ignores wall-clock adjustments."""
+        validator = EmailValidator(anti_spam_mode=True)
+        domain = "example.com"
+        mock_time.return_value = 1_000_000.0
+        mock_monotonic.return_value = 5000.0
+        for _ in range(validator.max_requests_per_hour):
+            validator._check_rate_limit(domain)
+
+        # Wall clock jumps back a day: still inside the window
+        mock_time.return_value -= 86400
+        assert validator._check_rate_limit(domain) is False
+
+        mock_monotonic.return_value += 3601
         assert validator._check_rate_limit(domain) is True
 
-        # Fill up the rate limit
-        validator.requests_per_domain[domain] = validator.max_requests_per_hour
+    @patch('email_validation.cli.time.monotonic')
+    def test_rate_limit_window_slides(self, mock_monotonic):
+        """Test that checks leave the window one by one as they age past an hour."""
+        validator = EmailValidator(anti_spam_mode=True)
+        validator.max_requests_per_hour = 2
+        domain = "example.com"
 
-        # Should block further requests
+        mock_monotonic.return_value = 0.0
+        assert validator._check_rate_limit(domain) is True
+        mock_monotonic.return_value = 1800.0
+        assert validator._check_rate_limit(domain) is True
+        assert validator._check_rate_limit(domain) is False
+
+        # Only the first check has aged out; steady traffic is never locked out
+        mock_monotonic.return_value = 3601.0
+        assert validator._check_rate_limit(domain) is True
         assert validator._check_rate_limit(domain) is False
 
     def test_domain_delay_handling(self):